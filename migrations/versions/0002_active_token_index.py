@@ -0,0 +1,31 @@
+"""Extend the active refresh token index with expires_at
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_refresh_tokens_user_revoked_exp", "refresh_tokens", ["user_uuid", "revoked", "expires_at"]
+    )
+    op.drop_index("ix_refresh_tokens_user_revoked", table_name="refresh_tokens")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_refresh_tokens_user_revoked", "refresh_tokens", ["user_uuid", "revoked"])
+    op.drop_index("ix_refresh_tokens_user_revoked_exp", table_name="refresh_tokens")
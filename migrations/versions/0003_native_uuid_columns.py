@@ -0,0 +1,44 @@
+"""Store user UUIDs and refresh token JTIs in native UUID columns
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# PostgreSQL's default name for the refresh_tokens.user_uuid foreign key
+_USER_FK = "refresh_tokens_user_uuid_fkey"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Both sides of the foreign key change type, so it is recreated around the conversion
+    op.drop_constraint(_USER_FK, "refresh_tokens", type_="foreignkey")
+    op.alter_column("users", "uuid", type_=sa.Uuid(as_uuid=False), postgresql_using="uuid::uuid")
+    op.alter_column(
+        "refresh_tokens", "user_uuid", type_=sa.Uuid(as_uuid=False), postgresql_using="user_uuid::uuid"
+    )
+    op.alter_column("refresh_tokens", "jti", type_=sa.Uuid(as_uuid=False), postgresql_using="jti::uuid")
+    op.create_foreign_key(_USER_FK, "refresh_tokens", "users", ["user_uuid"], ["uuid"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(_USER_FK, "refresh_tokens", type_="foreignkey")
+    op.alter_column("refresh_tokens", "jti", type_=sa.String(length=36), postgresql_using="jti::text")
+    op.alter_column(
+        "refresh_tokens", "user_uuid", type_=sa.String(length=36), postgresql_using="user_uuid::text"
+    )
+    op.alter_column("users", "uuid", type_=sa.String(length=36), postgresql_using="uuid::text")
+    op.create_foreign_key(_USER_FK, "refresh_tokens", "users", ["user_uuid"], ["uuid"])
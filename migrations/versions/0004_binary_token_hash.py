@@ -0,0 +1,36 @@
+"""Store refresh token hashes as raw SHA-256 digests
+
+The hex digests already stored are decoded in place, so issued refresh tokens stay valid.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        "refresh_tokens", "token_hash",
+        type_=sa.LargeBinary(32), postgresql_using="decode(token_hash, 'hex')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        "refresh_tokens", "token_hash",
+        type_=sa.String(length=64), postgresql_using="encode(token_hash, 'hex')"
+    )
@@ -0,0 +1,41 @@
+"""
+Compile the .env file into a plain Python module.
+
+Run at deploy time with `python -m src.compile_env`. The generated
+src/env_compiled.py is imported by src/config.py instead of parsing .env,
+so production startups load settings from cached bytecode.
+"""
+import keyword
+import sys
+from pathlib import Path
+from dotenv import dotenv_values, find_dotenv
+
+OUTPUT_PATH = Path(__file__).with_name("env_compiled.py")
+
+def is_env_key(key: str) -> bool:
+    """Whether key can be written as a variable of the compiled module (and is not a module dunder)."""
+    return key.isidentifier() and not keyword.iskeyword(key) and not key.startswith("__")
+
+def read_env_file(env_path: str | None = None) -> dict[str, str]:
+    """Read the variables of env_path (by default the nearest .env), skipping keys without a value."""
+    return {
+        key: value for key, value in dotenv_values(env_path or find_dotenv()).items() if value is not None
+    }
+
+def compile_env(env_path: str = ".env", output_path: Path = OUTPUT_PATH) -> int:
+    """
+    Write every key of env_path as a string literal. Returns the count of written keys.
+    Raises ValueError if a key cannot be a variable of the module, rather than dropping it.
+    """
+    values = read_env_file(env_path)
+    invalid = [key for key in values if not is_env_key(key)]
+    if invalid:
+        raise ValueError(f"Invalid variable names in {env_path}: {', '.join(invalid)}")
+    lines = ['"""Generated by `python -m src.compile_env` - do not edit."""']
+    lines += [f"{key} = {value!r}" for key, value in values.items()]
+    output_path.write_text("\n".join(lines) + "\n")
+    return len(values)
+
+if __name__ == "__main__":
+    count = compile_env(*sys.argv[1:2])
+    print(f"✓ Compiled {count} variables into {OUTPUT_PATH}")
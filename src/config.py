@@ -1,22 +1,118 @@
 import os
-from dotenv import load_dotenv
+from dataclasses import dataclass
+from functools import lru_cache
+from src.compile_env import is_env_key, read_env_file
 
-# Load variables from .env
-load_dotenv()
+def _load_env() -> None:
+    """
+    Load variables into the environment, without overriding those already set.
+    Prefers the module generated by `python -m src.compile_env` (served from
+    the bytecode cache) and falls back to parsing .env in development.
+    Called once, at import.
+    """
+    try:
+        from src import env_compiled
+    except ImportError:
+        values = read_env_file()
+    else:
+        values = {key: value for key, value in vars(env_compiled).items() if is_env_key(key)}
+    for key, value in values.items():
+        os.environ.setdefault(key, value)
+
+_load_env()
 
 def get_required_env_var(var_name: str) -> str:
     value = os.getenv(var_name)
     if not value:
         raise ValueError("Configuration error - check logs")
     return value
-DATABASE_URL = get_required_env_var("DATABASE_URL")
-ENV = os.getenv("ENV", "development")
-SECRET_KEY = get_required_env_var("SECRET_KEY")
-REFRESH_SECRET_KEY = get_required_env_var("REFRESH_SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
-REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
-MAX_ACTIVE_TOKENS_PER_USER = int(os.getenv("MAX_ACTIVE_TOKENS_PER_USER", "5"))
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Application settings, read from the environment once per process."""
+    database_url: str
+    env: str
+    secret_key: str
+    refresh_secret_key: str
+    algorithm: str
+    access_token_expire_minutes: int
+    refresh_token_expire_days: int
+    max_active_tokens_per_user: int
+    access_token_cache_seconds: int
+    # Database connection pool
+    db_pool_size: int
+    db_max_overflow: int
+    db_pool_timeout: int
+    sql_echo: bool
+    # Rate limiting
+    rate_limit_storage_uri: str
+    # Expired refresh token cleanup
+    refresh_token_cleanup_interval_hours: int
+    refresh_token_cleanup_batch_size: int
+    # Argon2 password hashing
+    argon2_time_cost: int
+    argon2_memory_cost: int
+    argon2_parallelism: int
+    # JWT Claims
+    jwt_issuer: str
+    jwt_audience: str
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the Settings instance from a single snapshot of the environment."""
+    env = os.environ
+    settings = Settings(
+        database_url=get_required_env_var("DATABASE_URL"),
+        env=env.get("ENV", "development"),
+        secret_key=get_required_env_var("SECRET_KEY"),
+        refresh_secret_key=get_required_env_var("REFRESH_SECRET_KEY"),
+        algorithm=env.get("ALGORITHM", "HS256"),
+        access_token_expire_minutes=int(env.get("ACCESS_TOKEN_EXPIRE_MINUTES", "30")),
+        refresh_token_expire_days=int(env.get("REFRESH_TOKEN_EXPIRE_DAYS", "7")),
+        max_active_tokens_per_user=int(env.get("MAX_ACTIVE_TOKENS_PER_USER", "5")),
+        access_token_cache_seconds=int(env.get("ACCESS_TOKEN_CACHE_SECONDS", "30")),
+        db_pool_size=int(env.get("DB_POOL_SIZE", "20")),
+        db_max_overflow=int(env.get("DB_MAX_OVERFLOW", "40")),
+        db_pool_timeout=int(env.get("DB_POOL_TIMEOUT", "30")),
+        sql_echo=env.get("SQL_ECHO") == "1",
+        rate_limit_storage_uri=env.get("RATE_LIMIT_STORAGE_URI", "memory://"),
+        refresh_token_cleanup_interval_hours=int(env.get("REFRESH_TOKEN_CLEANUP_INTERVAL_HOURS", "24")),
+        refresh_token_cleanup_batch_size=int(env.get("REFRESH_TOKEN_CLEANUP_BATCH_SIZE", "1000")),
+        argon2_time_cost=int(env.get("ARGON2_TIME_COST", "3")),
+        argon2_memory_cost=int(env.get("ARGON2_MEMORY_COST", "65536")),
+        argon2_parallelism=int(env.get("ARGON2_PARALLELISM", "4")),
+        jwt_issuer=env.get("JWT_ISSUER", "hermes-api"),
+        jwt_audience=env.get("JWT_AUDIENCE", "hermes-mobile-app"),
+    )
+    if settings.max_active_tokens_per_user < 1:
+        raise ValueError("MAX_ACTIVE_TOKENS_PER_USER must be at least 1")
+    return settings
+
+_S = get_settings()
+
+DATABASE_URL = _S.database_url
+ENV = _S.env
+SECRET_KEY = _S.secret_key
+REFRESH_SECRET_KEY = _S.refresh_secret_key
+ALGORITHM = _S.algorithm
+ACCESS_TOKEN_EXPIRE_MINUTES = _S.access_token_expire_minutes
+REFRESH_TOKEN_EXPIRE_DAYS = _S.refresh_token_expire_days
+MAX_ACTIVE_TOKENS_PER_USER = _S.max_active_tokens_per_user
+ACCESS_TOKEN_CACHE_SECONDS = _S.access_token_cache_seconds
+# Database connection pool
+DB_POOL_SIZE = _S.db_pool_size
+DB_MAX_OVERFLOW = _S.db_max_overflow
+DB_POOL_TIMEOUT = _S.db_pool_timeout
+SQL_ECHO = _S.sql_echo
+# Rate limiting
+RATE_LIMIT_STORAGE_URI = _S.rate_limit_storage_uri
+# Expired refresh token cleanup
+REFRESH_TOKEN_CLEANUP_INTERVAL_HOURS = _S.refresh_token_cleanup_interval_hours
+REFRESH_TOKEN_CLEANUP_BATCH_SIZE = _S.refresh_token_cleanup_batch_size
+# Argon2 password hashing
+ARGON2_TIME_COST = _S.argon2_time_cost
+ARGON2_MEMORY_COST = _S.argon2_memory_cost
+ARGON2_PARALLELISM = _S.argon2_parallelism
 # JWT Claims
-JWT_ISSUER = os.getenv("JWT_ISSUER", "hermes-api")
-JWT_AUDIENCE = os.getenv("JWT_AUDIENCE", "hermes-mobile-app")
+JWT_ISSUER = _S.jwt_issuer
+JWT_AUDIENCE = _S.jwt_audience
@@ -1,6 +1,6 @@
 from sqlmodel import create_engine, Session, SQLModel
 from typing import Generator
-from src.config import DATABASE_URL, ENV
+from src.config import DATABASE_URL, SQL_ECHO, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT
 
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL must be set in environment variables")
@@ -11,11 +11,17 @@ connect_args = {"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
 
 engine = create_engine(
     DATABASE_URL,
-    echo=ENV == "development",
-    pool_size=5,
-    max_overflow=10,
+    # Statement logging is opt-in: formatting every query is costly even in development
+    echo=SQL_ECHO,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    # Reuse the most recently returned connection so idle ones can time out server-side
+    pool_use_lifo=True,
     pool_pre_ping=True,
-    pool_recycle=3600,
+    pool_recycle=1800,
+    # Room for every distinct repository statement in the compiled-SQL cache
+    query_cache_size=1200,
     connect_args=connect_args
 )
 
@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 from sqlmodel import SQLModel, Field, Index
+from sqlalchemy import LargeBinary, Uuid
 from typing import Optional
 import uuid as uuid_lib
 
@@ -11,11 +12,12 @@ class UserDB(SQLModel, table=True):
     __tablename__ = "users"  # type: ignore[assignment]:
 
     id: Optional[int] = Field(default=None, primary_key=True)
+    # Native UUID column (16 bytes on PostgreSQL), exposed to Python as a str
     uuid: str = Field(
         default_factory=lambda: str(uuid_lib.uuid4()),
         unique=True,
         index=True,
-        max_length=36
+        sa_type=Uuid(as_uuid=False)
     )
     username: str = Field(index=True, unique=True, max_length=50)
     email: str = Field(unique=True, max_length=255)
@@ -41,16 +43,18 @@ class RefreshTokenDB(SQLModel, table=True):
     """
     __tablename__ = "refresh_tokens"  # type: ignore[assignment]:
     __table_args__ = (
-          Index('ix_refresh_tokens_user_revoked', 'user_uuid', 'revoked'),
+          # Covers the active-token predicate (user_uuid, NOT revoked, expires_at > now)
+          Index('ix_refresh_tokens_user_revoked_exp', 'user_uuid', 'revoked', 'expires_at'),
     )
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    jti: str = Field(unique=True, index=True, max_length=36)
-    token_hash: str = Field(index=True, max_length=64)
+    jti: str = Field(unique=True, index=True, sa_type=Uuid(as_uuid=False))
+    # Raw SHA-256 digest (32 bytes) of the refresh token
+    token_hash: bytes = Field(index=True, sa_type=LargeBinary(32))
     user_uuid: str = Field(
-        foreign_key="users.uuid", 
+        foreign_key="users.uuid",
         index=True,
-        max_length=36
+        sa_type=Uuid(as_uuid=False)
     )
     expires_at: datetime = Field(nullable=False, index=True)
     created_at: datetime = Field(
@@ -0,0 +1,41 @@
+import asyncio
+import logging
+from datetime import timedelta
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+from src.config import REFRESH_TOKEN_CLEANUP_BATCH_SIZE, REFRESH_TOKEN_CLEANUP_INTERVAL_HOURS, REFRESH_TOKEN_EXPIRE_DAYS
+from src.database.connection import engine
+from src.repositories.refresh_token_repository import RefreshTokenRepository
+
+logger = logging.getLogger(__name__)
+
+# Revoked tokens are kept as long as they could have lived, for auditing reuse attempts
+REVOKED_RETENTION = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+
+def purge_stale_tokens(batch_size: int = REFRESH_TOKEN_CLEANUP_BATCH_SIZE) -> int:
+    """
+    Delete expired and old revoked refresh tokens in batches, committing after each one
+    so locks are held briefly. Returns the total count of deleted tokens.
+    """
+    total = 0
+    with Session(engine) as session:
+        while True:
+            deleted = RefreshTokenRepository.delete_stale_tokens_batch(session, batch_size, REVOKED_RETENTION)
+            total += deleted
+            if deleted < batch_size:
+                return total
+
+async def run(
+    interval_hours: int = REFRESH_TOKEN_CLEANUP_INTERVAL_HOURS,
+    batch_size: int = REFRESH_TOKEN_CLEANUP_BATCH_SIZE
+) -> None:
+    """Purge stale refresh tokens every interval_hours until cancelled."""
+    while True:
+        await asyncio.sleep(interval_hours * 3600)
+        try:
+            deleted = await asyncio.to_thread(purge_stale_tokens, batch_size)
+        except SQLAlchemyError:
+            # Keep the schedule alive through database errors; the next run retries
+            logger.exception("Refresh token cleanup failed")
+            continue
+        logger.info("Purged %d stale refresh tokens", deleted)
@@ -1,38 +1,101 @@
+import asyncio
+import logging
 from contextlib import asynccontextmanager
+from functools import partial
 from fastapi import FastAPI, Depends, HTTPException, status, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from src.routers import auth, users
 from src.database.connection import create_db_and_tables, get_db
+from src.jobs import cleanup_expired_tokens
 from src.config import ENV
-from sqlmodel import Session, literal, select
+from sqlmodel import Session
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from src.rate_limiter import limiter
+from starlette.types import Receive, Scope, Send
 import os
 
+logger = logging.getLogger(__name__)
+
+HEALTH_PATHS = frozenset({"/health/live", "/health/ready"})
+_PING = text("SELECT 1")
+
+# Delay before retrying failed startup work, doubled after each failure up to the cap
+INIT_RETRY_SECONDS = 1.0
+INIT_RETRY_MAX_SECONDS = 30.0
+
+class HealthExemptHTTPSRedirectMiddleware(HTTPSRedirectMiddleware):
+    """HTTPS redirect that lets plain-HTTP load balancer probes reach the health endpoints directly."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in HEALTH_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+async def _deferred_init(app: FastAPI) -> None:
+    """
+    Run heavy startup work (DB DDL) after the server is already accepting connections.
+    Database errors (e.g. the database not accepting connections yet) are logged and retried
+    with backoff; /health/ready reports 503 until startup has completed.
+    """
+    # In production the schema is managed by migrations, not at runtime
+    if ENV != "production":
+        delay = INIT_RETRY_SECONDS
+        while True:
+            try:
+                await asyncio.to_thread(create_db_and_tables)
+                break
+            except SQLAlchemyError:
+                logger.exception("Database initialization failed, retrying in %.0fs", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, INIT_RETRY_MAX_SECONDS)
+    app.state.ready = True
+
+def _log_task_failure(message: str, task: asyncio.Task) -> None:
+    """Log the error that ended a background task, which would otherwise vanish with it."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(message, exc_info=task.exception())
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan function to handle startup and shutdown events."""
-    create_db_and_tables()
+    app.state.ready = False
+    # Keep a reference so the task is not garbage collected before completion
+    app.state.init_task = asyncio.create_task(_deferred_init(app))
+    app.state.init_task.add_done_callback(
+        partial(_log_task_failure, "Startup failed; the service will not become ready")
+    )
+    app.state.cleanup_task = asyncio.create_task(cleanup_expired_tokens.run())
+    app.state.cleanup_task.add_done_callback(
+        partial(_log_task_failure, "Refresh token cleanup stopped; stale tokens will no longer be purged")
+    )
     yield
-    # Here you can add code to run on application shutdown
+    app.state.cleanup_task.cancel()
+    if not app.state.init_task.done():
+        app.state.init_task.cancel()
 
 app = FastAPI(
     title="Hermes API",
     description="API for Hermes application",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Responses are encoded with orjson instead of the stdlib json module
+    default_response_class=ORJSONResponse
 )
 
 # Security Middlewares
 # Only enforce HTTPS in production to allow local development
 if ENV == "production":
-    app.add_middleware(HTTPSRedirectMiddleware)
+    app.add_middleware(HealthExemptHTTPSRedirectMiddleware)
     print("HTTPS enforcement enabled (production mode)")
 
     # Optionally add TrustedHostMiddleware to prevent host header attacks
+    # Added last so it runs first: bad hosts are rejected before any redirect
     allowed_hosts = os.getenv("ALLOWED_HOSTS", "*").split(",")
     if allowed_hosts != ["*"]:
         app.add_middleware(TrustedHostMiddleware, allowed_hosts=allowed_hosts)
@@ -47,19 +110,30 @@ app.include_router(users.router)
 
 @app.exception_handler(HTTPException)
 async def global_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"message": exc.detail},
     )
 
-@app.get("/health", tags=["monitoring"], summary="Health Check", description="Check the health status of the API.")
-async def health_check(session: Session = Depends(get_db)):
+@app.get("/health/live", tags=["monitoring"], summary="Liveness Check", description="Check that the API process is up.")
+async def liveness_check():
+    return {"status": "alive"}
+
+def require_ready() -> None:
+    """Reject requests with 503 until deferred startup has completed."""
+    if not app.state.ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Service starting")
+
+@app.get("/health/ready", tags=["monitoring"], summary="Readiness Check", description="Check that startup has completed and the database is reachable.")
+def health_check(_: None = Depends(require_ready), session: Session = Depends(get_db)):
+    # require_ready is resolved first, so no session is opened while starting up
     try:
         # Simple query to check database connectivity
-        session.exec(select(literal(1)))
+        session.connection().scalar(_PING)
         return {
             "status": "healthy",
             "database": "connected",
         }
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Service unavailable") from e
+    except SQLAlchemyError as e:
+        # 503 so load balancers take the instance out of rotation instead of seeing an error
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database unavailable") from e
@@ -1,5 +1,14 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from src.config import RATE_LIMIT_STORAGE_URI
 
 # Single limiter instance to be used across the application
-limiter = Limiter(key_func=get_remote_address, default_limits=["100/minute"])
+# With a shared storage (e.g. redis://) limits hold across workers and replicas.
+# The sliding window counter keeps two counters per key, so each hit is O(1)
+# in storage, unlike the moving window which stores one entry per request.
+limiter = Limiter(
+    key_func=get_remote_address,
+    default_limits=["100/minute"],
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy="sliding-window-counter",
+)
@@ -1,8 +1,21 @@
 from sqlmodel import Session, col, select
-from src.database.models import RefreshTokenDB
+from src.database.models import RefreshTokenDB, UserDB
 from typing import Optional
-from datetime import datetime, timezone
-from sqlalchemy import func, update, delete
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, bindparam, func, insert, or_, update, delete
+
+# Statements are built once at import; values are bound per call.
+# Timestamps are taken server-side with NOW() rather than sent as bind parameters.
+_GET_BY_JTI = select(RefreshTokenDB).where(RefreshTokenDB.jti == bindparam("jti"))
+_GET_VALID_WITH_USER_BY_JTI = (
+    select(RefreshTokenDB, UserDB)
+    .join(UserDB, col(UserDB.uuid) == RefreshTokenDB.user_uuid)
+    .where(
+        RefreshTokenDB.jti == bindparam("jti"),
+        col(RefreshTokenDB.revoked).is_(False),
+        RefreshTokenDB.expires_at > func.now()
+    )
+)
 
 class RefreshTokenRepository:
     """Repository for CRUD operations on refresh tokens"""
@@ -10,22 +23,21 @@ class RefreshTokenRepository:
     @staticmethod
     def get_by_jti(db: Session, jti: str) -> Optional[RefreshTokenDB]:
         """Get a refresh token by JTI (JWT ID)"""
-        statement = select(RefreshTokenDB).where(RefreshTokenDB.jti == jti)
-        return db.exec(statement).first()
+        return db.exec(_GET_BY_JTI, params={"jti": jti}).first()
     
     @staticmethod
-    def get_valid_token_by_jti(db: Session, jti: str) -> Optional[RefreshTokenDB]:
-        """Get a valid (not expired, not revoked) refresh token by JTI (JWT ID)"""
-        now = datetime.now(timezone.utc)
-        statement = select(RefreshTokenDB).where(
-            RefreshTokenDB.jti == jti,
-            col(RefreshTokenDB.revoked).is_(False),
-            RefreshTokenDB.expires_at > now
-        )
-        return db.exec(statement).first()
+    def get_valid_token_and_user_by_jti(db: Session, jti: str) -> Optional[tuple[RefreshTokenDB, UserDB]]:
+        """
+        Get a valid (not expired, not revoked) refresh token by JTI together with its owner,
+        in a single JOIN. Returns None if the token is not valid or the user does not exist.
+        Not cached: rotation revokes each refresh token on its first use, so a JTI cache would
+        only be hit by reused tokens, which must see the revocation and the user's current state.
+        """
+        row = db.exec(_GET_VALID_WITH_USER_BY_JTI, params={"jti": jti}).first()
+        return tuple(row) if row else None
 
     @staticmethod
-    def create(db: Session, jti: str, token_hash: str, user_uuid: str, expires_at: datetime) -> RefreshTokenDB:
+    def create(db: Session, jti: str, token_hash: bytes, user_uuid: str, expires_at: datetime) -> RefreshTokenDB:
         """Create a new refresh token for a user in the database"""
         refresh_token = RefreshTokenDB(
             jti=jti,
@@ -38,6 +50,59 @@ class RefreshTokenRepository:
         db.refresh(refresh_token)
         return refresh_token
 
+    @staticmethod
+    def create_within_limit(
+        db: Session,
+        jti: str,
+        token_hash: bytes,
+        user_uuid: str,
+        expires_at: datetime,
+        max_active: int
+    ) -> str:
+        """
+        Create a new refresh token and revoke the user's oldest active tokens so that at most
+        max_active remain, in a single statement (data-modifying CTE + INSERT ... RETURNING).
+        Returns the JTI of the new token. max_active must be at least 1.
+        The limit is not a hard cap: concurrent logins of the same user do not see each other's
+        uncommitted INSERT, so each may add its token; the excess is revoked by the next login.
+        created_at is set client-side: NOW() is fixed per transaction and would tie the ordering.
+        """
+        now = datetime.now(timezone.utc)
+        excess_ids = (
+            select(col(RefreshTokenDB.id))
+            .where(
+                RefreshTokenDB.user_uuid == user_uuid,
+                col(RefreshTokenDB.revoked).is_(False),
+                RefreshTokenDB.expires_at > func.now()
+            )
+            .order_by(col(RefreshTokenDB.created_at).desc())
+            .offset(max_active - 1)
+            .with_for_update()
+        )
+        revoke_excess = (
+            update(RefreshTokenDB)
+            .where(col(RefreshTokenDB.id).in_(excess_ids))
+            .values(revoked=True, revoked_at=func.now())
+            .returning(col(RefreshTokenDB.id))
+            .cte("revoke_excess")
+        )
+        statement = (
+            insert(RefreshTokenDB)
+            .values(
+                jti=jti,
+                token_hash=token_hash,
+                user_uuid=user_uuid,
+                expires_at=expires_at,
+                created_at=now,
+                revoked=False,
+            )
+            .add_cte(revoke_excess)
+            .returning(col(RefreshTokenDB.jti))
+        )
+        created_jti = db.exec(statement).scalar_one()
+        db.commit()
+        return created_jti
+
     @staticmethod
     def revoke(db: Session, refresh_token: RefreshTokenDB) -> RefreshTokenDB:
         """Revoke a refresh token (soft delete)"""
@@ -49,26 +114,51 @@ class RefreshTokenRepository:
         return refresh_token
     
     @staticmethod
-    def revoke_by_jti(db: Session, jti: str) -> bool:
-        """Revoke a refresh token by its JTI (JWT ID)"""
-        token = RefreshTokenRepository.get_by_jti(db, jti)
-        if token and not token.revoked:
-            token.revoked = True
-            token.revoked_at = datetime.now(timezone.utc)
-            db.add(token)
+    def revoke_by_jti(db: Session, jti: str, commit: bool = True) -> bool:
+        """
+        Revoke a refresh token by its JTI (JWT ID) in a single UPDATE.
+        Returns False if the token does not exist or was already revoked.
+        With commit=False the caller is responsible for committing the transaction.
+        """
+        statement = (
+            update(RefreshTokenDB)
+            .where(col(RefreshTokenDB.jti) == jti)
+            .where(col(RefreshTokenDB.revoked).is_(False))
+            .values(revoked=True, revoked_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        result = db.exec(statement)
+        if commit:
             db.commit()
-            return True
-        return False
+        return result.rowcount > 0
     
+    @staticmethod
+    def revoke_by_token_hash(db: Session, token_hash: bytes) -> bool:
+        """
+        Revoke a valid (not expired, not revoked) refresh token by its hash in a single UPDATE.
+        Returns False if no such token exists.
+        """
+        statement = (
+            update(RefreshTokenDB)
+            .where(col(RefreshTokenDB.token_hash) == token_hash)
+            .where(col(RefreshTokenDB.revoked).is_(False))
+            .where(col(RefreshTokenDB.expires_at) > func.now())
+            .values(revoked=True, revoked_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        result = db.exec(statement)
+        db.commit()
+        return result.rowcount > 0
+
     @staticmethod
     def revoke_all_for_user(db: Session, user_uuid: str) -> int:
         """Revoke all refresh tokens for a specific user. Returns the count of revoked tokens."""
-        now = datetime.now(timezone.utc)
         statement = (
             update(RefreshTokenDB)
             .where(col(RefreshTokenDB.user_uuid) == user_uuid)
             .where(col(RefreshTokenDB.revoked).is_(False))
-            .values(revoked=True, revoked_at=now)        
+            .values(revoked=True, revoked_at=func.now())
+            .execution_options(synchronize_session=False)
         )
         result = db.exec(statement)
         db.commit()
@@ -77,41 +167,51 @@ class RefreshTokenRepository:
     @staticmethod
     def delete_expired_tokens(db: Session) -> int:
         """Delete all expired refresh tokens from the database. Returns the count of deleted tokens."""
-        now = datetime.now(timezone.utc)
-        statement = delete(RefreshTokenDB).where(col(RefreshTokenDB.expires_at) < now)
+        statement = (
+            delete(RefreshTokenDB)
+            .where(col(RefreshTokenDB.expires_at) < func.now())
+            .execution_options(synchronize_session=False)
+        )
         result = db.exec(statement)
         db.commit()
         return result.rowcount
     
+    @staticmethod
+    def delete_stale_tokens_batch(db: Session, batch_size: int, revoked_retention: timedelta) -> int:
+        """
+        Delete up to batch_size tokens that are expired, or were revoked and created more than
+        revoked_retention ago. Returns the count of deleted tokens.
+        """
+        stale_ids = (
+            select(col(RefreshTokenDB.id))
+            .where(
+                or_(
+                    col(RefreshTokenDB.expires_at) <= func.now(),
+                    and_(
+                        col(RefreshTokenDB.revoked).is_(True),
+                        col(RefreshTokenDB.created_at) < func.now() - revoked_retention
+                    )
+                )
+            )
+            .limit(batch_size)
+        )
+        statement = (
+            delete(RefreshTokenDB)
+            .where(col(RefreshTokenDB.id).in_(stale_ids))
+            .execution_options(synchronize_session=False)
+        )
+        result = db.exec(statement)
+        db.commit()
+        return result.rowcount
+
     @staticmethod
     def count_active_tokens_for_user(db: Session, user_uuid: str) -> int:
         """Count the number of active (not revoked, not expired) refresh tokens for a specific user."""
-        now = datetime.now(timezone.utc)
         statement = select(func.count()).select_from(RefreshTokenDB).where(
             RefreshTokenDB.user_uuid == user_uuid,
             col(RefreshTokenDB.revoked).is_(False),
-            RefreshTokenDB.expires_at > now
+            RefreshTokenDB.expires_at > func.now()
         )
 
         result = db.exec(statement).one()
         return result
-    
-    @staticmethod
-    def revoke_oldest_tokens(db: Session, user_uuid: str) -> bool:
-        """Revoke the oldest active (not revoked, not expired) token for a user."""
-        now = datetime.now(timezone.utc)
-        statement = select(RefreshTokenDB).where(
-            RefreshTokenDB.user_uuid == user_uuid,
-            col(RefreshTokenDB.revoked).is_(False),
-            RefreshTokenDB.expires_at > now
-        ).order_by(col(RefreshTokenDB.created_at)).limit(1)
-
-        oldest = db.exec(statement).first()
-        if oldest:
-            oldest.revoked = True
-            oldest.revoked_at = datetime.now(timezone.utc)
-            db.add(oldest)
-            db.commit()
-            return True
-        return False
-    
\ No newline at end of file
@@ -1,39 +1,48 @@
-from sqlmodel import Session, select
+from sqlmodel import Session, col, select
+from sqlalchemy import bindparam, update
 from src.database.models import UserDB
 from typing import Optional
 from datetime import datetime, timezone
 
+# Statements are built once at import; values are bound per call
+_GET_BY_USERNAME = select(UserDB).where(UserDB.username == bindparam("username"))
+_GET_BY_EMAIL = select(UserDB).where(UserDB.email == bindparam("email"))
+_GET_BY_UUID = select(UserDB).where(UserDB.uuid == bindparam("uuid"))
+
 class UserRepository:
     """Repository for CRUD operations on users"""
 
     @staticmethod
     def get_by_username(db: Session, username: str) -> Optional[UserDB]:
         """Search for a user by username"""
-        statement = select(UserDB).where(UserDB.username == username)
-        return db.exec(statement).first()
+        return db.exec(_GET_BY_USERNAME, params={"username": username}).first()
 
     @staticmethod
     def get_by_email(db: Session, email: str) -> Optional[UserDB]:
         """Search for a user by email"""
-        statement = select(UserDB).where(UserDB.email == email)
-        return db.exec(statement).first()
+        return db.exec(_GET_BY_EMAIL, params={"email": email}).first()
 
     @staticmethod
     def get_by_uuid(db: Session, uuid: str) -> Optional[UserDB]:
         """Search for a user by UUID"""
-        statement = select(UserDB).where(UserDB.uuid == uuid)
-        return db.exec(statement).first()
+        return db.exec(_GET_BY_UUID, params={"uuid": uuid}).first()
 
     @staticmethod
     def get_by_id(db: Session, user_id: int) -> Optional[UserDB]:
-        """Search for a user by ID"""
-        statement = select(UserDB).where(UserDB.id == user_id)
-        return db.exec(statement).first()
+        """Search for a user by ID (primary key, checks the identity map first)"""
+        return db.get(UserDB, user_id)
 
     @staticmethod
-    def create(db: Session, user: UserDB) -> UserDB:
-        """Create a new user in the database"""
+    def create(db: Session, user: UserDB, commit: bool = True) -> UserDB:
+        """
+        Create a new user in the database.
+        With commit=False the row is only flushed, leaving the caller to commit it
+        together with later writes in the same transaction.
+        """
         db.add(user)
+        if not commit:
+            db.flush()
+            return user
         db.commit()
         db.refresh(user)
         return user
@@ -47,6 +56,19 @@ class UserRepository:
         db.refresh(user)
         return user
 
+    @staticmethod
+    def deactivate(db: Session, user_id: int) -> bool:
+        """Disable a user by ID in a single UPDATE. Returns False if the user does not exist."""
+        statement = (
+            update(UserDB)
+            .where(col(UserDB.id) == user_id)
+            .values(disabled=True, updated_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        result = db.exec(statement)
+        db.commit()
+        return result.rowcount > 0
+
     @staticmethod
     def delete(db: Session, user: UserDB) -> None:
         """Delete a user from the database"""
@@ -11,6 +11,7 @@ from src.services.auth import authenticate_user, verify_refresh_token, create_an
 from src.config import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
 from src.rate_limiter import limiter
 from src.repositories.refresh_token_repository import RefreshTokenRepository
+from src.utils.security import hash_token
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
 
@@ -23,7 +24,7 @@ router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
                         "Mobile clients should use the /login endpoint instead.",
 )
 @limiter.limit("10/minute")
-async def get_access_token(
+def get_access_token(
     request: Request, # noqa: ARG001
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     session: Session = Depends(get_db)
@@ -59,7 +60,7 @@ async def get_access_token(
             }
 )
 @limiter.limit("10/minute")
-async def login(
+def login(
     request: Request, # noqa: ARG001
     credentials: LoginRequest,
     session: Session = Depends(get_db) # noqa: B008
@@ -106,12 +107,13 @@ async def login(
     }
 )
 @limiter.limit("10/hour")
-async def register(
+def register(
     request: Request, # noqa: ARG001
     user_create: UserCreate,
     session: Session = Depends(get_db), # noqa: B008
 ) -> AuthResponse:
-    user = add_user(session=session, **user_create.model_dump())
+    # The user row is committed together with its refresh token below
+    user = add_user(session=session, commit=False, **user_create.model_dump())
     if not user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -152,7 +154,7 @@ async def register(
     }
 )
 @limiter.limit("10/minute")
-async def refresh_token_endpoint(
+def refresh_token_endpoint(
     request: Request, # noqa: ARG001
     refresh_request: RefreshRequest,
     session: Session = Depends(get_db), # noqa: B008
@@ -166,7 +168,8 @@ async def refresh_token_endpoint(
         )
     user, old_jti = result
 
-    if not RefreshTokenRepository.revoke_by_jti(session, old_jti):
+    # Revocation is committed together with the new refresh token below
+    if not RefreshTokenRepository.revoke_by_jti(session, old_jti, commit=False):
         # Token was already revoked (e.g., race or prior logout); treat as invalid
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -207,22 +210,20 @@ async def refresh_token_endpoint(
     }
 )
 @limiter.limit("10/minute")
-async def logout(
+def logout(
     request: Request, # noqa: ARG001
     refresh_request: RefreshRequest,
     session: Session = Depends(get_db), # noqa: B008
 ) -> MessageResponse:
-    # Verify refresh token is valid
-    result = verify_refresh_token(session, refresh_request.refresh_token)
-    if result is None:
+    # Only tokens whose hash was stored at issue time can match, so the JWT does not need
+    # to be decoded first: a single UPDATE both checks and revokes the token
+    revoked = RefreshTokenRepository.revoke_by_token_hash(session, hash_token(refresh_request.refresh_token))
+    if not revoked:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token",
             headers={"WWW-Authenticate": "bearer"},
         )
-    _, jti = result
-    
-    RefreshTokenRepository.revoke_by_jti(session, jti)
 
     return MessageResponse(
         message="User logged out successfully"
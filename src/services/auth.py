@@ -1,16 +1,30 @@
 from datetime import datetime, timedelta, timezone
+import secrets
 import uuid
+from hmac import compare_digest
 import jwt
 from jwt.exceptions import InvalidTokenError
 from sqlmodel import Session
 from src.config import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_SECRET_KEY, SECRET_KEY, ALGORITHM, JWT_ISSUER, JWT_AUDIENCE, MAX_ACTIVE_TOKENS_PER_USER, REFRESH_TOKEN_EXPIRE_DAYS
 from src.schemas.auth import TokenType
-from src.utils.security import verify_password, hash_token
+from src.utils.security import get_password_hash, verify_password, hash_token
 from src.utils.validators import normalize_username
-from src.services.user import get_user, get_user_by_uuid
+from src.services.user import get_user, to_user
 from src.schemas.user import User
 from src.repositories.refresh_token_repository import RefreshTokenRepository
 
+# Real argon2id hash verified when the user does not exist, so verification takes similar time.
+# Created at import with the configured Argon2 parameters, so its cost matches the hashes of
+# real users and no login pays for creating it.
+_DUMMY_HASH = get_password_hash(secrets.token_urlsafe(16))
+
+# HMAC keys encoded once, so PyJWT does not normalize the secret on every call
+_ACCESS_KEY = SECRET_KEY.encode()
+_REFRESH_KEY = REFRESH_SECRET_KEY.encode()
+_ALGORITHMS = [ALGORITHM]
+
+# Issued refresh tokens are a few hundred bytes; anything far larger is rejected unverified
+_MAX_TOKEN_LENGTH = 4096
 
 def authenticate_user(db: Session, username: str, password: str) -> User | None:
     """
@@ -27,11 +41,10 @@ def authenticate_user(db: Session, username: str, password: str) -> User | None:
 
     # Use realistic dummy hash if user doesn't exist to maintain constant timing
     # This prevents attackers from distinguishing "user not found" vs "wrong password"
-    # The dummy hash is a real argon2id hash, ensuring verification takes similar time
     hashed_password = (
         user_with_password.hashed_password
         if user_with_password
-        else "$argon2id$v=19$m=65536,t=3,p=4$owhEzyl8AD7mt/kgiE9Teg$yr8YHFdTrbvr1TdNYTU0I3bTjKw6BPN4FKqkHPNOxpo"
+        else _DUMMY_HASH
     )
 
     # Always verify password, even if user doesn't exist (constant-time operation)
@@ -62,7 +75,7 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
         "iss": JWT_ISSUER,
         "aud": JWT_AUDIENCE
         })
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _ACCESS_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 def create_refresh_token(data: dict, expires_delta: timedelta | None = None) -> tuple[str, str, datetime]:
@@ -82,7 +95,7 @@ def create_refresh_token(data: dict, expires_delta: timedelta | None = None) ->
         "iss": JWT_ISSUER,
         "aud": JWT_AUDIENCE
         })
-    encoded_jwt = jwt.encode(to_encode, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _REFRESH_KEY, algorithm=ALGORITHM)
     return encoded_jwt, jti, expire
 
 def verify_refresh_token(db: Session, token: str) -> tuple[User, str] | None:
@@ -97,13 +110,19 @@ def verify_refresh_token(db: Session, token: str) -> tuple[User, str] | None:
     - Token hash matches
     - User exists and is active
 
+    The token and its user are loaded with a single query.
+
     Returns User and jti if valid, None otherwise.
     """
+    # Reject oversized or malformed input before computing its HMAC
+    if len(token) > _MAX_TOKEN_LENGTH or token.count(".") != 2:
+        return None
+
     try:
         payload = jwt.decode(
             token,
-            REFRESH_SECRET_KEY,
-            algorithms=[ALGORITHM],
+            _REFRESH_KEY,
+            algorithms=_ALGORITHMS,
             audience=JWT_AUDIENCE,
             issuer=JWT_ISSUER
         )
@@ -119,26 +138,26 @@ def verify_refresh_token(db: Session, token: str) -> tuple[User, str] | None:
     if not user_uuid or not jti:
         return None
 
-    # Verify token exists in database and is valid (not revoked, not expired)
-    token_record = RefreshTokenRepository.get_valid_token_by_jti(db, jti)
-    if not token_record:
+    # Verify token exists in database and is valid (not revoked, not expired), and load its user
+    result = RefreshTokenRepository.get_valid_token_and_user_by_jti(db, jti)
+    if not result:
         return None
-        
+    token_record, user_db = result
+
     # Ensure the DB record belongs to the same user as the JWT subject
     if token_record.user_uuid != user_uuid:
         return None
 
-    # Verify token hash matches (prevents token theft from DB)
+    # Verify token hash matches (prevents token theft from DB), in constant time
     token_hash_calculated = hash_token(token)
-    if token_record.token_hash != token_hash_calculated:
+    if not compare_digest(token_record.token_hash, token_hash_calculated):
         return None
 
-    # Verify user exists and is active
-    user = get_user_by_uuid(db, user_uuid)
-    if not user or user.disabled:
+    # Verify user is active
+    if user_db.disabled:
         return None
 
-    return user, jti
+    return to_user(user_db), jti
 
     
     
@@ -149,10 +168,6 @@ def create_and_store_tokens(
         refresh_expires: timedelta
     ) -> tuple[str, str]:
 
-    active_count = RefreshTokenRepository.count_active_tokens_for_user(db, user_uuid)
-    if active_count >= MAX_ACTIVE_TOKENS_PER_USER:
-        RefreshTokenRepository.revoke_oldest_tokens(db, user_uuid)
-
     access_token = create_access_token(
         data={"sub": user_uuid},
         expires_delta=access_expires
@@ -162,14 +177,15 @@ def create_and_store_tokens(
         expires_delta=refresh_expires
     )
 
-    # Store hashed token in database
+    # Store hashed token in database, revoking the oldest ones beyond the per-user limit
     token_hash = hash_token(refresh_token)
-    RefreshTokenRepository.create(
+    RefreshTokenRepository.create_within_limit(
         db=db,
         user_uuid=user_uuid,
         jti=jti,
         token_hash=token_hash,
-        expires_at=expire
+        expires_at=expire,
+        max_active=MAX_ACTIVE_TOKENS_PER_USER
     )
 
     return access_token, refresh_token
\ No newline at end of file
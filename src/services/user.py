@@ -10,16 +10,24 @@ def get_user(db: Session, username: str) -> UserInDB | None:
     """Get user with hashed password - for authentication only"""
     user = UserRepository.get_by_username(db, username)
     if user:
-        return UserInDB.model_validate(user.model_dump())
+        return UserInDB.model_validate(user, from_attributes=True)
     return None
 
 def get_user_by_uuid(db: Session, uuid: str) -> User | None:
     """Get user without password - safe for general use"""
     user = UserRepository.get_by_uuid(db, uuid)
     if user:
-        return User.model_validate(user.model_dump())
+        return to_user(user)
     return None
 
+def to_user(user: UserDB) -> User:
+    """
+    Convert a user row loaded from the database to User (without password).
+    Validating straight from the row's attributes runs in pydantic-core and is faster than
+    model_construct, which copies the fields in Python (see tests/benchmarks).
+    """
+    return User.model_validate(user, from_attributes=True)
+
 def add_user(
         session: Session,
         username: str,
@@ -27,7 +35,8 @@ def add_user(
         first_name: str,
         last_name: str,
         password: str,
-        created_at: datetime | None = None
+        created_at: datetime | None = None,
+        commit: bool = True
     ) -> UserDB | None:
     """
     Create a new user in the database.
@@ -35,6 +44,8 @@ def add_user(
     Returns None if user already exists (duplicate username or email).
     Relies on database unique constraints for data integrity,
     preventing race conditions through database-level enforcement.
+    With commit=False the user is only flushed so the caller can commit it
+    in the same transaction as subsequent writes.
     """
     try:
         if created_at is None:
@@ -51,16 +62,18 @@ def add_user(
             created_at=created_at
         )
 
-        return UserRepository.create(session, db_user)
+        return UserRepository.create(session, db_user, commit=commit)
     except IntegrityError:
         # Unique constraint violation (username or email already exists)
         # Rollback is handled automatically by SQLModel
         session.rollback()
         return None
     
-def deactivate_user(session: Session, user: UserDB) -> UserDB:
-    """Deactivate an existing user account"""
+def deactivate_user(session: Session, user: User) -> bool:
+    """
+    Deactivate an existing user account without loading its row again.
+    Returns False if the user no longer exists.
+    """
     if user.disabled:
-        return user  # Skip Db write if already disabled
-    user.disabled = True
-    return UserRepository.update(session, user)
\ No newline at end of file
+        return True  # Skip Db write if already disabled
+    return UserRepository.deactivate(session, user.id)
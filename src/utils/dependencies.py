@@ -1,18 +1,72 @@
+import hashlib
+import time
 import uuid as uuid_lib
-from typing import Annotated
+from typing import Annotated, Any
 import jwt
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from sqlmodel import Session
-from src.config import SECRET_KEY, ALGORITHM, JWT_ISSUER, JWT_AUDIENCE
+from src.config import SECRET_KEY, ALGORITHM, JWT_ISSUER, JWT_AUDIENCE, ACCESS_TOKEN_CACHE_SECONDS
 from src.schemas.user import User
 from src.schemas.auth import TokenType
 from src.services.user import get_user_by_uuid
 from src.database.connection import get_db
+from src.utils.cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
+# Verified access tokens: blake2b(token) -> (exp, User), or _NOT_FOUND for validly signed
+# tokens whose user does not exist.
+# The cache is per process: a user deactivated through one worker is still accepted by the
+# others for up to ACCESS_TOKEN_CACHE_SECONDS. Set it to 0 to look the user up on every request.
+_NOT_FOUND = object()
+_NEGATIVE_TTL = 5
+_ACCESS_TOKEN_CACHE: TTLCache[bytes, Any] = TTLCache(maxsize=10_000, ttl=ACCESS_TOKEN_CACHE_SECONDS)
+
+# HMAC key encoded once, so PyJWT does not normalize the secret on every call
+_ACCESS_KEY = SECRET_KEY.encode()
+_ALGORITHMS = [ALGORITHM]
+
+def invalidate_cached_user(user_uuid: str) -> None:
+    """
+    Drop cached authentications of a user, e.g. after the account changes state.
+    Only affects this process: other workers keep theirs until they expire.
+    """
+    _ACCESS_TOKEN_CACHE.pop_where(lambda entry: entry is not _NOT_FOUND and entry[1].uuid == user_uuid)
+
+def clear_access_token_cache() -> None:
+    """Drop all cached authentications (e.g. between tests)"""
+    _ACCESS_TOKEN_CACHE.clear()
+
+def _decode_access_token(token: str) -> tuple[str, float] | None:
+    """Return (user uuid, exp) for a valid access token, None otherwise"""
+    try:
+        payload = jwt.decode(
+            token,
+            _ACCESS_KEY,
+            algorithms=_ALGORITHMS,
+            audience=JWT_AUDIENCE,
+            issuer=JWT_ISSUER
+        )
+    except InvalidTokenError:
+        return None
+
+    if payload.get("type") != TokenType.ACCESS:
+        return None
+
+    uuid_str: str = payload.get("sub")
+    if uuid_str is None:
+        return None
+
+    try:
+        uuid_lib.UUID(uuid_str)
+    except ValueError:
+        return None
+
+    return uuid_str, payload["exp"]
+
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     session: Session = Depends(get_db)
@@ -22,33 +76,28 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token,
-            SECRET_KEY,
-            algorithms=[ALGORITHM],
-            audience=JWT_AUDIENCE,
-            issuer=JWT_ISSUER
-        )
-        
-        if payload.get("type") != TokenType.ACCESS:
-            raise credentials_exception
-        
-        uuid_str: str = payload.get("sub")
-        if uuid_str is None:
-            raise credentials_exception
-
-        try:
-            uuid_lib.UUID(uuid_str)
-        except ValueError:
-            raise credentials_exception from None
-
-    except InvalidTokenError:
-        raise credentials_exception from None
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    cached = _ACCESS_TOKEN_CACHE.get(cache_key)
+    if cached is _NOT_FOUND:
+        raise credentials_exception
+    if cached is not None:
+        exp, cached_user = cached
+        if exp > time.time():
+            return cached_user
+        _ACCESS_TOKEN_CACHE.pop(cache_key)
 
-    user = get_user_by_uuid(session, uuid=uuid_str)
+    claims = _decode_access_token(token)
+    if claims is None:
+        # Not cached: anyone can send unsigned tokens, and they would evict verified users
+        raise credentials_exception
+    # Blocking DB call: run it in the threadpool to keep the event loop free
+    user = await run_in_threadpool(get_user_by_uuid, session, uuid=claims[0])
     if user is None:
+        # Remember the rejection briefly so a signed token of a missing user skips the DB
+        _ACCESS_TOKEN_CACHE.set(cache_key, _NOT_FOUND, ttl=_NEGATIVE_TTL)
         raise credentials_exception
+    if ACCESS_TOKEN_CACHE_SECONDS > 0:
+        _ACCESS_TOKEN_CACHE.set(cache_key, (claims[1], user))
     return user
 
 async def get_current_active_user(current_user: Annotated[User, Depends(get_current_user)]) -> User:
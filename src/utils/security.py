@@ -1,14 +1,47 @@
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 import hashlib
+import hmac
+from src.config import ARGON2_MEMORY_COST, ARGON2_PARALLELISM, ARGON2_TIME_COST, SECRET_KEY
+from src.utils.cache import TTLCache
 
-password_hash = PasswordHash.recommended()
+# Single Argon2 hasher: verify() needs no identifier scan across multiple hashers
+password_hash = PasswordHash((
+    Argon2Hasher(
+        time_cost=ARGON2_TIME_COST,
+        memory_cost=ARGON2_MEMORY_COST,
+        parallelism=ARGON2_PARALLELISM,
+    ),
+))
+
+# Successful verifications only, keyed by an HMAC so plain passwords are never stored
+_VERIFIED_PASSWORD_CACHE: TTLCache[bytes, bool] = TTLCache(maxsize=1024, ttl=60)
+
+def _password_cache_key(plain_password: str, hashed_password: str) -> bytes:
+    message = plain_password.encode() + b"|" + hashed_password.encode()
+    return hmac.new(SECRET_KEY.encode(), message, hashlib.sha256).digest()[:16]
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return password_hash.verify(plain_password, hashed_password)
+    """
+    Verify a password against its hash.
+    Recent successful verifications are cached to skip repeating Argon2 on re-login;
+    failures are never cached, so wrong passwords always pay the full cost.
+    """
+    cache_key = _password_cache_key(plain_password, hashed_password)
+    if _VERIFIED_PASSWORD_CACHE.get(cache_key):
+        return True
+    verified = password_hash.verify(plain_password, hashed_password)
+    if verified:
+        _VERIFIED_PASSWORD_CACHE.set(cache_key, True)
+    return verified
+
+def clear_password_cache() -> None:
+    """Drop all cached verifications (e.g. between tests)"""
+    _VERIFIED_PASSWORD_CACHE.clear()
 
 def get_password_hash(password: str) -> str:
     return password_hash.hash(password)
 
-def hash_token(token: str) -> str:
-    """Hash a token using SHA256 for secure storage"""
-    return hashlib.sha256(token.encode()).hexdigest()
\ No newline at end of file
+def hash_token(token: str) -> bytes:
+    """Hash a token using SHA256 for secure storage (raw 32-byte digest)"""
+    return hashlib.sha256(token.encode()).digest()
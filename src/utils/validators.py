@@ -1,10 +1,39 @@
-import re
+import string
+
+# Usernames are lowercased by normalize_username before this set is checked
+_USERNAME_CHARS = frozenset(string.ascii_lowercase + string.digits + '_.-')
+_RESERVED_USERNAMES = frozenset({'admin', 'root', 'superuser', 'system'})
+
+# Password character classes as bits; each byte of the table maps to its class bit
+_UPPER, _LOWER, _DIGIT, _SPECIAL = 1, 2, 4, 8
+_SPECIAL_CHARS = b'-!@#$%^&*(),.?":{}|<>'
+
+def _build_char_class_table() -> bytes:
+    table = bytearray(256)
+    for byte in range(256):
+        if 65 <= byte <= 90:
+            table[byte] = _UPPER
+        elif 97 <= byte <= 122:
+            table[byte] = _LOWER
+        elif 48 <= byte <= 57:
+            table[byte] = _DIGIT
+        elif byte in _SPECIAL_CHARS:
+            table[byte] = _SPECIAL
+    return bytes(table)
+
+_CHAR_CLASS_TABLE = _build_char_class_table()
 
 def normalize_username(value: str) -> str:
-    value = value.lower().strip()
+    # strip() returns the same object when there is nothing to strip
+    value = value.strip()
 
     if not value:
         raise ValueError("Username cannot be empty")
+    # Lowercasing never shortens a string, so oversized input is rejected before copying it
+    if len(value) > 50:
+        raise ValueError("Username must be between 3 and 50 characters")
+    if not value.islower():
+        value = value.lower()
     if len(value) < 3 or len(value) > 50:
         raise ValueError("Username must be between 3 and 50 characters")
     return value
@@ -12,9 +41,9 @@ def normalize_username(value: str) -> str:
 def validate_username(value: str) -> str:
     value = normalize_username(value)
 
-    if not re.match(r'^[a-zA-Z0-9_.-]+$', value):
+    if not _USERNAME_CHARS.issuperset(value):
         raise ValueError('Username can only contain letters, numbers, and _ . - characters')
-    if value in {'admin', 'root', 'superuser', 'system'}:
+    if value in _RESERVED_USERNAMES:
         raise ValueError('This username is reserved and cannot be used')
     return value
 
@@ -24,13 +53,18 @@ def validate_password(value: str) -> str:
     if len(value) > 128:
         raise ValueError('Password must be at most 128 characters')
 
-    if not re.search(r"[A-Z]", value):
+    # Single pass: map every byte to its class bit, then OR the distinct bits together.
+    # Non-ASCII bytes map to 0, matching the ASCII-only character classes.
+    mask = 0
+    for bits in set(value.encode("utf-8", "surrogatepass").translate(_CHAR_CLASS_TABLE)):
+        mask |= bits
+
+    if not mask & _UPPER:
         raise ValueError('Password must contain at least one uppercase letter')
-    if not re.search(r"[a-z]", value):
+    if not mask & _LOWER:
         raise ValueError('Password must contain at least one lowercase letter')
-    if not re.search(r"[0-9]", value):
+    if not mask & _DIGIT:
         raise ValueError('Password must contain at least one digit')
-    if not re.search(r"[-!@#$%^&*(),.?\":{}|<>]", value):
+    if not mask & _SPECIAL:
         raise ValueError('Password must contain at least one special character')
     return value
-
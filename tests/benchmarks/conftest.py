@@ -0,0 +1,2 @@
+"""Fixtures for the benchmarks: the sample user rows are shared with the unit tests."""
+from tests.unit.conftest import sample_now, sample_user_db  # noqa: F401 - fixtures re-exported for the benchmarks
@@ -0,0 +1,99 @@
+"""Benchmarks for the authentication hot paths.
+
+Benchmarks are deselected from normal test runs (-m "not benchmark" in pyproject.toml),
+so the production-parameter Argon2 hash does not slow the suite down. To measure, and
+to compare against a saved run:
+
+    uv run pytest tests/benchmarks -m benchmark --benchmark-autosave
+    uv run pytest tests/benchmarks -m benchmark --benchmark-compare --benchmark-compare-fail=mean:20%
+"""
+import asyncio
+import pytest
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from src.database.models import UserDB
+from src.schemas.user import User
+from src.services.auth import create_access_token
+from src.services.user import to_user
+from src.utils.dependencies import clear_access_token_cache, get_current_user
+from src.utils.security import get_password_hash, hash_token, verify_password
+
+PASSWORD = "SecurePassword123!"
+# Access tokens carry a UUID subject; the sample user is served under it
+USER_UUID = "550e8400-e29b-41d4-a716-446655440000"
+
+# Default (production) Argon2 parameters; the tests themselves run with minimal ones
+_PRODUCTION_HASHER = PasswordHash((Argon2Hasher(time_cost=3, memory_cost=65536, parallelism=4),))
+
+
+@pytest.fixture(name="authenticate")
+def authenticate_fixture(monkeypatch, sample_user_db):
+    """Run get_current_user to completion for a token, with the user lookup served from memory."""
+    user = to_user(sample_user_db).model_copy(update={"uuid": USER_UUID})
+    monkeypatch.setattr("src.utils.dependencies.get_user_by_uuid", lambda session, uuid: user)
+    loop = asyncio.new_event_loop()
+
+    def authenticate(token: str) -> User:
+        return loop.run_until_complete(get_current_user(token=token, session=None))
+
+    yield authenticate
+    loop.close()
+
+
+@pytest.mark.benchmark(group="security")
+def test_bench_argon2_hash_production_parameters(benchmark):
+    hashed = benchmark(_PRODUCTION_HASHER.hash, PASSWORD)
+    assert hashed.startswith("$argon2id$")
+
+
+@pytest.mark.benchmark(group="security")
+def test_bench_verify_password_cached(benchmark):
+    hashed = get_password_hash(PASSWORD)
+    verify_password(PASSWORD, hashed)
+
+    assert benchmark(verify_password, PASSWORD, hashed) is True
+
+
+@pytest.mark.benchmark(group="security")
+def test_bench_hash_token(benchmark):
+    assert len(benchmark(hash_token, "some.jwt.token")) == 32
+
+
+@pytest.mark.benchmark(group="tokens")
+def test_bench_create_access_token(benchmark):
+    assert benchmark(create_access_token, data={"sub": "test-uuid"})
+
+
+@pytest.mark.benchmark(group="tokens")
+def test_bench_get_current_user(benchmark, authenticate):
+    """Full authentication of a token seen for the first time: decode, claims checks and lookup."""
+    token = create_access_token(data={"sub": USER_UUID})
+
+    user = benchmark.pedantic(authenticate, args=(token,), setup=clear_access_token_cache, rounds=200)
+
+    assert user.uuid == USER_UUID
+
+
+@pytest.mark.benchmark(group="tokens")
+def test_bench_get_current_user_cached(benchmark, authenticate):
+    """Authentication of a token already verified, served from the in-process cache."""
+    token = create_access_token(data={"sub": USER_UUID})
+    authenticate(token)
+
+    assert benchmark(authenticate, token).uuid == USER_UUID
+
+
+@pytest.mark.benchmark(group="models")
+def test_bench_to_user(benchmark, sample_user_db):
+    """to_user validates the schema straight from the row's attributes."""
+    assert benchmark(to_user, sample_user_db).uuid == sample_user_db.uuid
+
+
+@pytest.mark.benchmark(group="models")
+def test_bench_user_model_construct(benchmark, sample_user_db):
+    """Alternative to to_user: skip validation with model_construct, copying the fields in Python."""
+    def construct(row: UserDB) -> User:
+        return User.model_construct(**{field: getattr(row, field) for field in User.model_fields})
+
+    assert benchmark(construct, sample_user_db).uuid == sample_user_db.uuid
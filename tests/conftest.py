@@ -1,24 +1,40 @@
-import tests.test_config  # noqa: F401 - must be first
+import tests.env  # noqa: F401 - sets environment defaults, must be imported before src
+import functools
 import os
+import psycopg2
 import pytest
 import subprocess
+import sys
 import time
-from fastapi.testclient import TestClient
+from typing import TYPE_CHECKING
+from sqlalchemy.schema import CreateSchema, DropSchema
 from sqlmodel import Session, SQLModel, create_engine
 
-from src.config import DATABASE_URL, ENV
-from src.main import app
-from src.database.connection import get_db
-from src.services.user import add_user
-from src.services.auth import create_and_store_tokens
+from src.config import DATABASE_URL, SQL_ECHO
+from src.database.models import UserDB
+from src.utils.security import clear_password_cache, get_password_hash
 from datetime import timedelta
 
+# The app stack (FastAPI, routers, the app's engine) is imported inside the fixtures that
+# need it, so collection and database-free unit test runs do not pay for loading it
+if TYPE_CHECKING:
+    from fastapi.testclient import TestClient
+
 
 def is_ci_environment():
     """Check if running in CI environment."""
     return os.getenv("CI") or os.getenv("GITHUB_ACTIONS")
 
 
+def database_accepts_connections():
+    """Check that the test database accepts an authenticated connection."""
+    try:
+        psycopg2.connect(DATABASE_URL, connect_timeout=1).close()
+    except psycopg2.OperationalError:
+        return False
+    return True
+
+
 @pytest.fixture(scope="session", autouse=True)
 def docker_compose_up():
     """Start test database before tests, stop after.
@@ -36,75 +52,120 @@ def docker_compose_up():
         check=True
     )
 
-    # Wait for database to be ready
-    max_retries = 30
-    for i in range(max_retries):
-        result = subprocess.run(
-            ["docker-compose", "-f", "docker-compose.test.yaml", "exec", "-T",
-             "postgres-test", "pg_isready", "-U", "hermes_user", "-d", "hermes_test"],
-            capture_output=True
-        )
-        if result.returncode == 0:
-            break
-        time.sleep(1)
-    else:
-        subprocess.run(
-            ["docker-compose", "-f", "docker-compose.test.yaml", "down", "-v"])
-        raise RuntimeError("Database did not become ready in time")
+    # Wait for database to be ready, connecting directly instead of running pg_isready
+    # in the container, which forks the docker CLI on every probe
+    deadline = time.monotonic() + 30
+    while not database_accepts_connections():
+        if time.monotonic() >= deadline:
+            subprocess.run(
+                ["docker-compose", "-f", "docker-compose.test.yaml", "down", "-v"])
+            raise RuntimeError("Database did not become ready in time")
+        time.sleep(0.1)
 
     yield
 
+    # KEEP_TEST_DB=1 leaves the container running so the next local run starts faster
+    if os.getenv("KEEP_TEST_DB") == "1":
+        return
     subprocess.run(
         ["docker-compose", "-f", "docker-compose.test.yaml", "down", "-v"],
         check=True
     )
 
 
-@pytest.fixture(name="engine", scope="module")
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Reset in-process caches so cached state does not leak between tests."""
+    # Only if already loaded: importing it pulls in FastAPI and the app engine
+    dependencies = sys.modules.get("src.utils.dependencies")
+    if dependencies is not None:
+        dependencies.clear_access_token_cache()
+    clear_password_cache()
+    yield
+
+
+@pytest.fixture(name="engine", scope="session")
 def engine_fixture():
-    engine = create_engine(
+    """Create the engine and tables once for the whole test run.
+
+    Tables live in a schema of their own per pytest-xdist worker (gw0 when not
+    running in parallel), so workers sharing the test database do not collide.
+    """
+    schema = f"test_{os.environ.get('PYTEST_XDIST_WORKER', 'gw0')}"
+    base_engine = create_engine(
         DATABASE_URL,
-        echo=ENV == "development",
+        echo=SQL_ECHO,
         pool_size=5,
         max_overflow=10,
         pool_pre_ping=True,
         pool_recycle=3600,
     )
+    with base_engine.begin() as connection:
+        connection.execute(DropSchema(schema, cascade=True, if_exists=True))
+        connection.execute(CreateSchema(schema))
+    engine = base_engine.execution_options(schema_translate_map={None: schema})
     SQLModel.metadata.create_all(engine)
     yield engine
-    SQLModel.metadata.drop_all(engine)
+    with base_engine.begin() as connection:
+        connection.execute(DropSchema(schema, cascade=True))
+    base_engine.dispose()
 
 
-@pytest.fixture(name="session")
-def session_fixture(engine):
-    """Create a new database session for each test with transaction isolation."""
+@pytest.fixture(name="connection", scope="module")
+def connection_fixture(engine):
+    """Open one connection and outer transaction per module, rolled back at the end."""
     connection = engine.connect()
     transaction = connection.begin()
-    session = Session(bind=connection, join_transaction_mode="create_savepoint")
-    yield session
-    session.close()
+    yield connection
     if transaction.is_active:
         transaction.rollback()
     connection.close()
 
 
+@pytest.fixture(name="session")
+def session_fixture(connection):
+    """Create a new database session for each test, isolated by a SAVEPOINT on the shared connection."""
+    savepoint = connection.begin_nested()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    yield session
+    session.close()
+    if savepoint.is_active:
+        savepoint.rollback()
+
+
+@pytest.fixture(name="app_client", scope="module")
+def app_client_fixture(engine):
+    """Start the app once per module: the lifespan runs when the TestClient is entered.
+
+    Its startup DDL runs on the test engine, so it targets this worker's schema instead of
+    every worker creating the same tables in the default schema at once.
+    """
+    from fastapi.testclient import TestClient
+    from src.main import app
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr("src.main.create_db_and_tables", lambda: SQLModel.metadata.create_all(engine))
+        with TestClient(app, follow_redirects=False) as client:
+            yield client
+
+
 @pytest.fixture(name="client")
-def client_fixture(session: Session):
-    """Create a test client with overridden database dependency."""
+def client_fixture(session: Session, app_client: "TestClient"):
+    """Test client of the shared app, with the database dependency overridden for this test."""
+    from src.database.connection import get_db
+    from src.main import app
+
     def get_session_override():
         return session
 
     app.dependency_overrides[get_db] = get_session_override
+    yield app_client
+    app.dependency_overrides.pop(get_db, None)
 
-    with TestClient(app, raise_server_exceptions=False) as client:
-        yield client
-
-    app.dependency_overrides.clear()
 
-
-@pytest.fixture(name="test_user_data")
+@pytest.fixture(name="test_user_data", scope="session")
 def test_user_data_fixture():
-    """Standard test user data."""
+    """Standard test user data. Shared by all tests: copy it before modifying."""
     return {
         "username": "testuser",
         "email": "test@example.com",
@@ -114,29 +175,56 @@ def test_user_data_fixture():
     }
 
 
+# Argon2 is deliberately slow, so each distinct test password is hashed once per run
+hash_test_password = functools.cache(get_password_hash)
+
+
+@pytest.fixture(name="make_users")
+def make_users_fixture(session: Session):
+    """Insert users described like test_user_data, batched into a single flush."""
+    def make_users(users_data: list[dict]) -> list[UserDB]:
+        users = [
+            UserDB(
+                username=data["username"],
+                email=data["email"],
+                first_name=data.get("first_name"),
+                last_name=data.get("last_name"),
+                hashed_password=hash_test_password(data["password"]),
+                disabled=False
+            )
+            for data in users_data
+        ]
+        session.add_all(users)
+        session.flush()
+        return users
+    return make_users
+
+
 @pytest.fixture(name="test_user")
-def test_user_fixture(session: Session, test_user_data):
+def test_user_fixture(test_user_data, make_users):
     """Create a test user in the database."""
-    user = add_user(
-        session=session,
-        username=test_user_data["username"],
-        email=test_user_data["email"],
-        first_name=test_user_data["first_name"],
-        last_name=test_user_data["last_name"],
-        password=test_user_data["password"]
-    )
-    return user
+    return make_users([test_user_data])[0]
+
+
+@pytest.fixture(name="make_tokens")
+def make_tokens_fixture(session: Session):
+    """Issue access and refresh tokens for a user through the service layer, skipping HTTP and login."""
+    from src.services.auth import create_and_store_tokens
+
+    def make_tokens(user_uuid: str) -> tuple[str, str]:
+        return create_and_store_tokens(
+            db=session,
+            user_uuid=user_uuid,
+            access_expires=timedelta(minutes=15),
+            refresh_expires=timedelta(days=7)
+        )
+    return make_tokens
 
 
 @pytest.fixture(name="test_user_tokens")
-def test_user_tokens_fixture(session: Session, test_user):
+def test_user_tokens_fixture(test_user, make_tokens):
     """Create access and refresh tokens for test user."""
-    access_token, refresh_token = create_and_store_tokens(
-        db=session,
-        user_uuid=test_user.uuid,
-        access_expires=timedelta(minutes=15),
-        refresh_expires=timedelta(days=7)
-    )
+    access_token, refresh_token = make_tokens(test_user.uuid)
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -150,9 +238,9 @@ def auth_headers_fixture(test_user_tokens):
     return {"Authorization": f"Bearer {test_user_tokens['access_token']}"}
 
 
-@pytest.fixture(name="second_user_data")
+@pytest.fixture(name="second_user_data", scope="session")
 def second_user_data_fixture():
-    """Data for a second test user."""
+    """Data for a second test user. Shared by all tests: copy it before modifying."""
     return {
         "username": "seconduser",
         "email": "second@example.com",
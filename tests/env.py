@@ -13,4 +13,8 @@ os.environ.setdefault("REFRESH_SECRET_KEY", "test_refresh_secret_key_fallback")
 os.environ.setdefault("ALGORITHM", "HS256")
 os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "15")
 os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
-os.environ.setdefault("MAX_ACTIVE_TOKENS_PER_USER", "3")
\ No newline at end of file
+os.environ.setdefault("MAX_ACTIVE_TOKENS_PER_USER", "3")
+# Minimal Argon2 parameters: hashing strength is irrelevant in tests and dominates their run time
+os.environ.setdefault("ARGON2_TIME_COST", "1")
+os.environ.setdefault("ARGON2_MEMORY_COST", "8")
+os.environ.setdefault("ARGON2_PARALLELISM", "1")
\ No newline at end of file
@@ -1,7 +1,9 @@
 """Tests for authentication endpoints."""
+import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlmodel import Session, col, select
 
+from src.database.models import RefreshTokenDB
 from src.repositories.refresh_token_repository import RefreshTokenRepository
 from src.config import MAX_ACTIVE_TOKENS_PER_USER
 
@@ -20,20 +22,19 @@ class TestRegister:
         assert "uuid" in data
         assert data["token_type"] == "bearer"
 
-    def test_register_duplicate_username(self, client: TestClient, test_user, test_user_data):
-        """Fail to register with duplicate username."""
-        # test_user fixture already created user with same username
+    @pytest.mark.parametrize(
+        ("changed_field", "changed_value"),
+        [
+            ("email", "different@example.com"),  # same username
+            ("username", "differentuser"),  # same email
+        ],
+        ids=["duplicate_username", "duplicate_email"],
+    )
+    def test_register_duplicate(self, client: TestClient, test_user, test_user_data, changed_field, changed_value):
+        """Fail to register when the username or email is already taken."""
+        # test_user fixture already created a user with the same data
         new_user_data = test_user_data.copy()
-        new_user_data["email"] = "different@example.com"
-
-        response = client.post("/api/v1/auth/register", json=new_user_data)
-
-        assert response.status_code == 409
-
-    def test_register_duplicate_email(self, client: TestClient, test_user, test_user_data):
-        """Fail to register with duplicate email."""
-        new_user_data = test_user_data.copy()
-        new_user_data["username"] = "differentuser"
+        new_user_data[changed_field] = changed_value
 
         response = client.post("/api/v1/auth/register", json=new_user_data)
 
@@ -41,9 +42,10 @@ class TestRegister:
 
     def test_register_invalid_email(self, client: TestClient, test_user_data):
         """Fail to register with invalid email format."""
-        test_user_data["email"] = "not-an-email"
+        invalid_user_data = test_user_data.copy()
+        invalid_user_data["email"] = "not-an-email"
 
-        response = client.post("/api/v1/auth/register", json=test_user_data)
+        response = client.post("/api/v1/auth/register", json=invalid_user_data)
 
         assert response.status_code == 422
 
@@ -245,19 +247,28 @@ class TestLogout:
 class TestMaxActiveTokens:
     """Tests for maximum active tokens per user limit"""
 
-    def test_max_tokens_revokes_oldest(self, client: TestClient, session: Session, test_user, test_user_data):
+    def test_max_tokens_revokes_oldest(self, client: TestClient, session: Session, test_user, test_user_data, make_tokens):
         """When max tokens reached, oldest should be revoked."""
-        tokens = []
+        # Reach the limit directly through the service layer
+        for _ in range(MAX_ACTIVE_TOKENS_PER_USER):
+            make_tokens(test_user.uuid)
 
-        # Create MAX_ACTIVE_TOKENS_PER_USER + 1 tokens
-        for _ in range(MAX_ACTIVE_TOKENS_PER_USER + 1):
-            response = client.post("/api/v1/auth/login", json={
-                "username": test_user_data["username"],
-                "password": test_user_data["password"]
-            })
-            assert response.status_code == 200
-            tokens.append(response.json()["refresh_token"])
+        # One more login over HTTP goes beyond the limit
+        response = client.post("/api/v1/auth/login", json={
+            "username": test_user_data["username"],
+            "password": test_user_data["password"]
+        })
+        assert response.status_code == 200
 
         # Check that we still have only MAX_ACTIVE_TOKENS_PER_USER active
         active_count = RefreshTokenRepository.count_active_tokens_for_user(session, test_user.uuid)
         assert active_count == MAX_ACTIVE_TOKENS_PER_USER
+
+        # The revoked one is the oldest
+        tokens = session.exec(
+            select(RefreshTokenDB)
+            .where(RefreshTokenDB.user_uuid == test_user.uuid)
+            .order_by(col(RefreshTokenDB.created_at))
+            .execution_options(populate_existing=True)
+        ).all()
+        assert [token.revoked for token in tokens] == [True] + [False] * MAX_ACTIVE_TOKENS_PER_USER
@@ -0,0 +1,106 @@
+"""Tests for the Alembic migrations (migrations/)."""
+import os
+from pathlib import Path
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.schema import CreateSchema
+from sqlmodel import SQLModel
+
+from src.config import DATABASE_URL
+import src.database.models  # noqa: F401 - registers the tables on SQLModel.metadata
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+USER_UUID = "550e8400-e29b-41d4-a716-446655440000"
+JTI = "6fa459ea-ee8a-3ca4-894e-db77e160355e"
+
+
+@pytest.fixture(name="migration_connection")
+def migration_connection_fixture():
+    """Connection to an empty schema of its own, created and rolled back in one transaction."""
+    schema = f"test_migrations_{os.environ.get('PYTEST_XDIST_WORKER', 'gw0')}"
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        connection.execute(CreateSchema(schema))
+        connection.execute(text(f"SET LOCAL search_path TO {schema}"))
+        yield connection
+        transaction.rollback()
+    engine.dispose()
+
+
+@pytest.fixture(name="alembic_config")
+def alembic_config_fixture(migration_connection):
+    """Alembic configuration running on migration_connection, without alembic.ini's logging setup."""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.attributes["connection"] = migration_connection
+    return config
+
+
+class TestMigrations:
+    """Tests for upgrading and downgrading the schema."""
+
+    def test_upgrade_creates_tables(self, alembic_config, migration_connection):
+        """Upgrading an empty database should create every table."""
+        command.upgrade(alembic_config, "head")
+
+        tables = set(inspect(migration_connection).get_table_names())
+        assert {"users", "refresh_tokens", "alembic_version"} <= tables
+
+    def test_head_matches_models(self, alembic_config, migration_connection):
+        """The migrated schema should match the SQLModel tables exactly."""
+        command.upgrade(alembic_config, "head")
+
+        diff = compare_metadata(MigrationContext.configure(migration_connection), SQLModel.metadata)
+
+        assert diff == []
+
+    def test_downgrade_drops_tables(self, alembic_config, migration_connection):
+        """Downgrading to base should leave only the version table."""
+        command.upgrade(alembic_config, "head")
+
+        command.downgrade(alembic_config, "base")
+
+        assert inspect(migration_connection).get_table_names() == ["alembic_version"]
+
+    def test_uuid_columns_converted(self, alembic_config, migration_connection):
+        """Existing UUID strings should survive the conversion to native UUID columns."""
+        command.upgrade(alembic_config, "0002")
+        migration_connection.execute(text(
+            "INSERT INTO users (uuid, username, email, hashed_password, disabled, created_at, updated_at) "
+            "VALUES (:uuid, 'testuser', 'test@example.com', 'hash', false, now(), now())"
+        ), {"uuid": USER_UUID})
+        migration_connection.execute(text(
+            "INSERT INTO refresh_tokens (jti, token_hash, user_uuid, expires_at, created_at, revoked) "
+            "VALUES (:jti, :token_hash, :uuid, now(), now(), false)"
+        ), {"jti": JTI, "token_hash": "ab" * 32, "uuid": USER_UUID})
+
+        command.upgrade(alembic_config, "0003")
+
+        row = migration_connection.execute(text(
+            "SELECT pg_typeof(t.jti)::text, t.jti::text, t.user_uuid::text "
+            "FROM refresh_tokens t JOIN users u ON u.uuid = t.user_uuid"
+        )).one()
+        assert tuple(row) == ("uuid", JTI, USER_UUID)
+
+    def test_token_hash_decoded(self, alembic_config, migration_connection):
+        """Stored hex digests should become the equivalent raw digests."""
+        command.upgrade(alembic_config, "0003")
+        migration_connection.execute(text(
+            "INSERT INTO users (uuid, username, email, hashed_password, disabled, created_at, updated_at) "
+            "VALUES (:uuid, 'testuser', 'test@example.com', 'hash', false, now(), now())"
+        ), {"uuid": USER_UUID})
+        migration_connection.execute(text(
+            "INSERT INTO refresh_tokens (jti, token_hash, user_uuid, expires_at, created_at, revoked) "
+            "VALUES (:jti, :token_hash, :uuid, now(), now(), false)"
+        ), {"jti": JTI, "token_hash": "ab" * 32, "uuid": USER_UUID})
+
+        command.upgrade(alembic_config, "0004")
+
+        token_hash = migration_connection.execute(text("SELECT token_hash FROM refresh_tokens")).scalar_one()
+        assert bytes(token_hash) == b"\xab" * 32
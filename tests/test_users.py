@@ -1,7 +1,11 @@
 """Tests for user endpoints."""
+from unittest.mock import Mock
 from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
 from sqlmodel import Session
 
+from src.database.connection import get_db
+from src.main import app
 from src.repositories.user_repository import UserRepository
 
 
@@ -108,13 +112,10 @@ class TestUserDataPrivacy:
         assert "password" not in data
         assert "hashed_password" not in data
 
-    def test_cannot_access_other_users(self, client: TestClient, session: Session, auth_headers, second_user_data):
+    def test_cannot_access_other_users(self, client: TestClient, auth_headers, second_user_data, make_users):
         """Users cannot access other users' data directly."""
-        from src.services.user import add_user
-
         # Create second user
-        second_user = add_user(session=session, **second_user_data)
-        assert second_user is not None
+        second_user, = make_users([second_user_data])
         # Get /me only returns current user's data
         response = client.get("/api/v1/users/me", headers=auth_headers)
 
@@ -125,13 +126,64 @@ class TestUserDataPrivacy:
 
 
 class TestHealthCheck:
-    """Tests for health check endpoint"""
+    """Tests for health check endpoints"""
+
+    def test_liveness_check(self, client: TestClient):
+        """Liveness check responds without waiting for startup."""
+        response = client.get("/health/live")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "alive"
 
-    def test_health_check(self, client: TestClient):
-        """Health check returns healthy status."""
-        response = client.get("/health")
+    def test_readiness_check(self, client: TestClient):
+        """Readiness check returns healthy status once startup has completed."""
+        async def wait_for_startup():
+            await app.state.init_task
+
+        client.portal.call(wait_for_startup)
+        response = client.get("/health/ready")
 
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
         assert data["database"] == "connected"
+
+    def test_readiness_check_before_startup(self, client: TestClient):
+        """Readiness check returns 503 while deferred startup is still running, without opening a session."""
+        sessions_opened = []
+
+        def get_session_override():
+            sessions_opened.append(True)
+
+        async def simulate_startup_in_progress():
+            await app.state.init_task
+            app.state.ready = False
+
+        client.portal.call(simulate_startup_in_progress)
+        app.dependency_overrides[get_db] = get_session_override
+        try:
+            response = client.get("/health/ready")
+        finally:
+            # The app is shared by the whole module
+            app.state.ready = True
+
+        assert response.status_code == 503
+        assert sessions_opened == []
+
+    def test_readiness_check_database_error(self, client: TestClient):
+        """Readiness check returns 503 when the database cannot be reached."""
+        def get_failing_session():
+            session = Mock()
+            session.connection.side_effect = OperationalError("SELECT 1", {}, Exception("connection refused"))
+            return session
+
+        async def wait_for_startup():
+            await app.state.init_task
+
+        client.portal.call(wait_for_startup)
+        app.dependency_overrides[get_db] = get_failing_session
+
+        response = client.get("/health/ready")
+
+        assert response.status_code == 503
+        assert response.json()["message"] == "Database unavailable"
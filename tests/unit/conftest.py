@@ -0,0 +1,49 @@
+"""Shared fixtures for the unit tests."""
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+import pytest
+from sqlmodel import Session
+
+from src.schemas.user import User, UserInDB
+from src.database.models import UserDB
+
+# Fields shared by the sample user in each of its representations
+SAMPLE_USER_FIELDS = {
+    "id": 1,
+    "uuid": "test-uuid",
+    "username": "testuser",
+    "email": "test@example.com",
+    "first_name": "Test",
+    "last_name": "User",
+    "disabled": False,
+}
+
+
+@pytest.fixture(scope="module")
+def sample_now() -> datetime:
+    """Fixed creation time of the sample user."""
+    return datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def sample_user(sample_now) -> User:
+    """Active user without password. Use model_copy(update=...) for variants, do not mutate."""
+    return User(**SAMPLE_USER_FIELDS, created_at=sample_now, updated_at=sample_now)
+
+
+@pytest.fixture(scope="module")
+def sample_user_in_db(sample_now) -> UserInDB:
+    """Active user with its hashed password. Use model_copy(update=...) for variants, do not mutate."""
+    return UserInDB(**SAMPLE_USER_FIELDS, hashed_password="hashed_password", created_at=sample_now, updated_at=sample_now)
+
+
+@pytest.fixture(scope="module")
+def sample_user_db(sample_now) -> UserDB:
+    """Database row of the active user. Use model_copy(update=...) for variants, do not mutate."""
+    return UserDB(**SAMPLE_USER_FIELDS, hashed_password="hashed_password", created_at=sample_now, updated_at=sample_now)
+
+
+@pytest.fixture
+def mock_session() -> MagicMock:
+    """Session for code under test that only passes it through; spec catches calls Session does not have."""
+    return MagicMock(spec=Session)
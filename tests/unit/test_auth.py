@@ -1,129 +1,147 @@
 """Unit tests for auth service (src/services/auth.py)."""
-import random
+from types import SimpleNamespace
 import pytest
 import jwt
 from unittest.mock import Mock, patch
 from datetime import timedelta, datetime, timezone
 
-from src.services.auth import create_access_token, create_refresh_token, authenticate_user, verify_refresh_token
+from src.services.auth import _DUMMY_HASH, create_access_token, create_refresh_token, authenticate_user, verify_refresh_token
 from src.config import SECRET_KEY, REFRESH_SECRET_KEY, ALGORITHM, JWT_ISSUER, JWT_AUDIENCE
 from src.schemas.auth import TokenType
-from src.schemas.user import User, UserInDB
+from src.schemas.user import User
+from src.services.user import get_user
+from src.utils.security import get_password_hash, verify_password
+from src.utils.validators import normalize_username
+
+# Keys encoded once, as the service does, instead of on every decode
+_ACCESS_KEY = SECRET_KEY.encode()
+_REFRESH_KEY = REFRESH_SECRET_KEY.encode()
+
+
+@pytest.fixture(name="access_token", scope="module")
+def access_token_fixture():
+    """Access token shared by the tests that only inspect its invariant claims."""
+    return create_access_token(data={"sub": "test-uuid"})
+
+
+@pytest.fixture(name="refresh_token", scope="module")
+def refresh_token_fixture():
+    """(token, jti, expire) of a refresh token shared by tests that do not need a fresh one."""
+    return create_refresh_token(data={"sub": "test-uuid"})
+
+
+def _claims(token: str) -> dict:
+    """Read a token's claims without verifying it, for tests that do not exercise the signature."""
+    return jwt.decode(token, options={"verify_signature": False})
+
+
+@pytest.fixture(name="frozen_now", autouse=True)
+def frozen_now_fixture(monkeypatch):
+    """
+    Freeze the clock read by the auth service. Whole seconds, like JWT timestamps,
+    so expirations compare exactly; tokens must still be unexpired when decoded.
+    """
+    fixed = datetime.now(timezone.utc).replace(microsecond=0)
+
+    class _FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return fixed
+
+    monkeypatch.setattr('src.services.auth.datetime', _FrozenDatetime)
+    return fixed
+
+
+@pytest.fixture(name="access_payload", scope="module")
+def access_payload_fixture(access_token):
+    """Claims of the shared access token, decoded once."""
+    return _claims(access_token)
+
+
+@pytest.fixture(name="refresh_payload", scope="module")
+def refresh_payload_fixture(refresh_token):
+    """Claims of the shared refresh token, decoded once."""
+    token, _, _ = refresh_token
+    return _claims(token)
 
 
 class TestCreateAccessToken:
     """Tests for access token creation."""
 
-    def test_create_access_token_returns_string(self):
+    def test_create_access_token_returns_string(self, access_token):
         """Access token should be a non-empty string."""
-        token = create_access_token(data={"sub": "user-uuid"})
-
-        assert isinstance(token, str)
-        assert len(token) > 0
+        assert isinstance(access_token, str)
+        assert len(access_token) > 0
 
-    def test_create_access_token_is_valid_jwt(self):
+    def test_create_access_token_is_valid_jwt(self, access_token):
         """Access token should be a valid JWT."""
-        token = create_access_token(data={"sub": "user-uuid"})
-
         # Should not raise
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
+        payload = jwt.decode(access_token, _ACCESS_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE, issuer=JWT_ISSUER)
         assert payload is not None
 
-    def test_create_access_token_contains_sub(self):
+    def test_create_access_token_contains_sub(self, access_payload):
         """Access token should contain subject claim."""
-        user_uuid = "test-user-uuid"
-        token = create_access_token(data={"sub": user_uuid})
-
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-        assert payload["sub"] == user_uuid
+        assert access_payload["sub"] == "test-uuid"
 
-    def test_create_access_token_contains_type(self):
+    def test_create_access_token_contains_type(self, access_payload):
         """Access token should have type 'access'."""
-        token = create_access_token(data={"sub": "user-uuid"})
-
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-        assert payload["type"] == TokenType.ACCESS
+        assert access_payload["type"] == TokenType.ACCESS
 
-    def test_create_access_token_contains_expiration(self):
+    def test_create_access_token_contains_expiration(self, access_payload):
         """Access token should have expiration claim."""
-        token = create_access_token(data={"sub": "user-uuid"})
+        assert "exp" in access_payload
+        assert access_payload["exp"] > datetime.now(timezone.utc).timestamp()
 
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-        assert "exp" in payload
-        assert payload["exp"] > datetime.now(timezone.utc).timestamp()
-
-    def test_create_access_token_custom_expiration(self):
+    def test_create_access_token_custom_expiration(self, frozen_now):
         """Access token should respect custom expiration delta."""
         expires = timedelta(minutes=5)
         token = create_access_token(data={"sub": "user-uuid"}, expires_delta=expires)
 
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-
-        # Expiration should be approximately 5 minutes from now
-        expected_exp = datetime.now(timezone.utc) + expires
-        actual_exp = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+        payload = _claims(token)
 
-        # Allow 2 seconds tolerance
-        assert abs((expected_exp - actual_exp).total_seconds()) < 2
+        assert payload["exp"] == (frozen_now + expires).timestamp()
+        assert payload["iat"] == frozen_now.timestamp()
 
-    def test_create_access_token_contains_iat(self):
+    def test_create_access_token_contains_iat(self, access_payload):
         """Access token should have issued-at claim."""
-        token = create_access_token(data={"sub": "user-uuid"})
-
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-        assert "iat" in payload
+        assert "iat" in access_payload
 
-    def test_create_access_token_contains_issuer(self):
+    def test_create_access_token_contains_issuer(self, access_payload):
         """Access token should have issuer claim."""
-        token = create_access_token(data={"sub": "user-uuid"})
+        assert access_payload["iss"] == JWT_ISSUER
 
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-        assert payload["iss"] == JWT_ISSUER
-
-    def test_create_access_token_contains_audience(self):
+    def test_create_access_token_contains_audience(self, access_payload):
         """Access token should have audience claim."""
-        token = create_access_token(data={"sub": "user-uuid"})
-
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-        assert payload["aud"] == JWT_AUDIENCE
+        assert access_payload["aud"] == JWT_AUDIENCE
 
-    def test_create_access_token_wrong_key_fails(self):
-        """Access token should not decode with wrong key."""
-        token = create_access_token(data={"sub": "user-uuid"})
-
-        with pytest.raises(jwt.InvalidSignatureError):
-            jwt.decode(token, "wrong-key", algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
 
 
 class TestCreateRefreshToken:
     """Tests for refresh token creation."""
 
-    def test_create_refresh_token_returns_tuple(self):
+    def test_create_refresh_token_returns_tuple(self, refresh_token):
         """Refresh token should return (token, jti, expire)."""
-        result = create_refresh_token(data={"sub": "user-uuid"})
-
-        assert isinstance(result, tuple)
-        assert len(result) == 3
+        assert isinstance(refresh_token, tuple)
+        assert len(refresh_token) == 3
 
-        token, jti, expire = result
+        token, jti, expire = refresh_token
         assert isinstance(token, str)
         assert isinstance(jti, str)
         assert isinstance(expire, datetime)
 
-    def test_create_refresh_token_is_valid_jwt(self):
+    def test_create_refresh_token_is_valid_jwt(self, refresh_token):
         """Refresh token should be a valid JWT."""
-        token, _, _ = create_refresh_token(data={"sub": "user-uuid"})
+        token, _, _ = refresh_token
 
         # Should not raise
-        payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
+        payload = jwt.decode(token, _REFRESH_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE, issuer=JWT_ISSUER)
         assert payload is not None
 
-    def test_create_refresh_token_contains_jti(self):
+    def test_create_refresh_token_contains_jti(self, refresh_token, refresh_payload):
         """Refresh token should contain unique jti claim."""
-        token, jti, _ = create_refresh_token(data={"sub": "user-uuid"})
+        _, jti, _ = refresh_token
 
-        payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-        assert payload["jti"] == jti
+        assert refresh_payload["jti"] == jti
         assert len(jti) > 0
 
     def test_create_refresh_token_jti_is_unique(self):
@@ -133,71 +151,44 @@ class TestCreateRefreshToken:
 
         assert jti1 != jti2
 
-    def test_create_refresh_token_contains_type(self):
+    def test_create_refresh_token_contains_type(self, refresh_payload):
         """Refresh token should have type 'refresh'."""
-        token, _, _ = create_refresh_token(data={"sub": "user-uuid"})
-
-        payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-        assert payload["type"] == TokenType.REFRESH
-
-    def test_create_refresh_token_uses_different_key(self):
-        """Refresh token should use different secret key than access token."""
-        token, _, _ = create_refresh_token(data={"sub": "user-uuid"})
-
-        # Should fail with access token key
-        with pytest.raises(jwt.InvalidSignatureError):
-            jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-
-        # Should succeed with refresh token key
-        payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-        assert payload is not None
+        assert refresh_payload["type"] == TokenType.REFRESH
 
-    def test_create_refresh_token_custom_expiration(self):
+    def test_create_refresh_token_custom_expiration(self, frozen_now):
         """Refresh token should respect custom expiration delta."""
         expires = timedelta(days=1)
         token, _, expire = create_refresh_token(data={"sub": "user-uuid"}, expires_delta=expires)
 
-        jwt.decode(token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
+        payload = _claims(token)
 
-        # Expiration should be approximately 1 day from now
-        expected_exp = datetime.now(timezone.utc) + expires
+        assert expire == frozen_now + expires
+        assert payload["exp"] == expire.timestamp()
 
-        # Allow 2 seconds tolerance
-        assert abs((expected_exp - expire).total_seconds()) < 2
-
-    def test_create_refresh_token_contains_issuer(self):
+    def test_create_refresh_token_contains_issuer(self, refresh_payload):
         """Refresh token should have issuer claim."""
-        token, _, _ = create_refresh_token(data={"sub": "user-uuid"})
-
-        payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-        assert payload["iss"] == JWT_ISSUER
+        assert refresh_payload["iss"] == JWT_ISSUER
 
 
 class TestTokenTypesSeparation:
     """Tests to ensure access and refresh tokens are properly separated."""
 
-    def test_access_token_cannot_decode_with_refresh_key(self):
-        """Access token should not decode with refresh secret key."""
-        access_token = create_access_token(data={"sub": "user-uuid"})
-
-        with pytest.raises(jwt.InvalidSignatureError):
-            jwt.decode(access_token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-
-    def test_refresh_token_cannot_decode_with_access_key(self):
-        """Refresh token should not decode with access secret key."""
-        refresh_token, _, _ = create_refresh_token(data={"sub": "user-uuid"})
+    @pytest.mark.parametrize("token_fixture,wrong_key", [
+        ("access_token", b"wrong-key"),
+        ("access_token", _REFRESH_KEY),
+        ("refresh_token", _ACCESS_KEY),
+    ])
+    def test_token_cannot_decode_with_wrong_key(self, request, token_fixture, wrong_key):
+        """Tokens should only decode with their own secret key."""
+        token = request.getfixturevalue(token_fixture)
+        if isinstance(token, tuple):
+            token, _, _ = token
 
         with pytest.raises(jwt.InvalidSignatureError):
-            jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
+            jwt.decode(token, wrong_key, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
 
-    def test_tokens_have_different_types(self):
+    def test_tokens_have_different_types(self, access_payload, refresh_payload):
         """Access and refresh tokens should have different type claims."""
-        access_token = create_access_token(data={"sub": "user-uuid"})
-        refresh_token, _, _ = create_refresh_token(data={"sub": "user-uuid"})
-
-        access_payload = jwt.decode(access_token, SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-        refresh_payload = jwt.decode(refresh_token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM], audience=JWT_AUDIENCE)
-
         assert access_payload["type"] == TokenType.ACCESS
         assert refresh_payload["type"] == TokenType.REFRESH
         assert access_payload["type"] != refresh_payload["type"]
@@ -206,86 +197,65 @@ class TestTokenTypesSeparation:
 class TestAuthenticateUser:
     """Tests for authenticate_user function."""
 
-    @patch('src.services.auth.verify_password')
-    @patch('src.services.auth.get_user')
-    @patch('src.services.auth.normalize_username')
-    def test_authenticate_user_success(self, mock_normalize, mock_get_user, mock_verify):
-        """Should return User when credentials are valid."""
-        mock_db = Mock()
-        mock_normalize.return_value = "testuser"
-        mock_user = UserInDB(
-            id=random.randint(1, 1000),
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            hashed_password="hashed_password",
-            disabled=False,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
+    @pytest.fixture(name="mocks", autouse=True)
+    def mocks_fixture(self, monkeypatch):
+        """
+        Replace the collaborators of authenticate_user for every test in the class.
+        Defaults describe an unknown user: normalization succeeds, no user is found
+        and the (dummy) password check fails.
+        """
+        mocks = SimpleNamespace(
+            verify=Mock(spec=verify_password, return_value=False),
+            get_user=Mock(spec=get_user, return_value=None),
+            normalize=Mock(spec=normalize_username, return_value="testuser"),
         )
-        mock_get_user.return_value = mock_user
-        mock_verify.return_value = True
+        monkeypatch.setattr('src.services.auth.verify_password', mocks.verify)
+        monkeypatch.setattr('src.services.auth.get_user', mocks.get_user)
+        monkeypatch.setattr('src.services.auth.normalize_username', mocks.normalize)
+        return mocks
 
-        result = authenticate_user(mock_db, "testuser", "password123")
+    def test_authenticate_user_success(self, mock_session, mocks, sample_user_in_db):
+        """Should return User when credentials are valid."""
+        mocks.get_user.return_value = sample_user_in_db
+        mocks.verify.return_value = True
+
+        result = authenticate_user(mock_session, "testuser", "password123")
 
         assert result is not None
         assert result.username == "testuser"
-        mock_verify.assert_called_once_with("password123", "hashed_password")
+        mocks.verify.assert_called_once_with("password123", "hashed_password")
 
-    @patch('src.services.auth.verify_password')
-    @patch('src.services.auth.get_user')
-    @patch('src.services.auth.normalize_username')
-    def test_authenticate_user_wrong_password(self, mock_normalize, mock_get_user, mock_verify):
+    def test_authenticate_user_wrong_password(self, mock_session, mocks, sample_user_in_db):
         """Should return None when password is wrong."""
-        mock_db = Mock()
-        mock_normalize.return_value = "testuser"
-        mock_user = UserInDB(
-            id=random.randint(1, 1000),
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            hashed_password="hashed_password",
-            disabled=False,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
-        )
-        mock_get_user.return_value = mock_user
-        mock_verify.return_value = False
+        mocks.get_user.return_value = sample_user_in_db
 
-        result = authenticate_user(mock_db, "testuser", "wrongpassword")
+        result = authenticate_user(mock_session, "testuser", "wrongpassword")
 
         assert result is None
 
-    @patch('src.services.auth.verify_password')
-    @patch('src.services.auth.get_user')
-    @patch('src.services.auth.normalize_username')
-    def test_authenticate_user_not_found(self, mock_normalize, mock_get_user, mock_verify):
+    def test_authenticate_user_not_found(self, mock_session, mocks):
         """Should return None when user doesn't exist."""
-        mock_db = Mock()
-        mock_normalize.return_value = "nonexistent"
-        mock_get_user.return_value = None
-        mock_verify.return_value = False  # Dummy hash verification
-
-        result = authenticate_user(mock_db, "nonexistent", "password123")
+        result = authenticate_user(mock_session, "nonexistent", "password123")
 
         assert result is None
+
+    def test_authenticate_user_not_found_single_argon2(self, mock_session, mocks, monkeypatch):
+        """Should only verify against the precomputed dummy hash, hashing nothing during the login."""
+        hash_password = Mock(spec=get_password_hash)
+        monkeypatch.setattr('src.services.auth.get_password_hash', hash_password)
+
+        authenticate_user(mock_session, "nonexistent", "password123")
+
+        hash_password.assert_not_called()
+        mocks.verify.assert_called_once_with("password123", _DUMMY_HASH)
         # Should still verify password (timing attack mitigation)
-        mock_verify.assert_called_once()
+        mocks.verify.assert_called_once()
 
-    @patch('src.services.auth.verify_password')
-    @patch('src.services.auth.get_user')
-    @patch('src.services.auth.normalize_username')
-    def test_authenticate_user_invalid_username(self, mock_normalize, mock_get_user, mock_verify):
+    def test_authenticate_user_invalid_username(self, mock_session, mocks):
         """Should return None when username is invalid."""
-        mock_db = Mock()
-        mock_normalize.side_effect = ValueError("Invalid username")
-        mock_verify.return_value = False
+        mocks.normalize.side_effect = ValueError("Invalid username")
 
-        result = authenticate_user(mock_db, "ab", "password123")
+        result = authenticate_user(mock_session, "ab", "password123")
 
         assert result is None
 
@@ -293,159 +263,87 @@ class TestAuthenticateUser:
 class TestVerifyRefreshToken:
     """Tests for verify_refresh_token function."""
 
-    @patch('src.services.auth.get_user_by_uuid')
-    @patch('src.services.auth.hash_token')
-    @patch('src.services.auth.RefreshTokenRepository')
-    def test_verify_refresh_token_success(self, mock_repo, mock_hash, mock_get_user):
-        """Should return User and jti when token is valid."""
-        mock_db = Mock()
+    @pytest.fixture(name="mocks", autouse=True)
+    def mocks_fixture(self, monkeypatch):
+        """Replace the token repository and hashing of verify_refresh_token for every test in the class."""
+        mocks = SimpleNamespace(repo=Mock(), hash=Mock())
+        monkeypatch.setattr('src.services.auth.RefreshTokenRepository', mocks.repo)
+        monkeypatch.setattr('src.services.auth.hash_token', mocks.hash)
+        return mocks
 
-        # Create a valid refresh token
-        token, jti, _ = create_refresh_token(data={"sub": "test-uuid"})
+    def test_verify_refresh_token_success(self, mock_session, mocks, sample_user_db, refresh_token):
+        """Should return User and jti when token is valid."""
+        # A valid refresh token
+        token, jti, _ = refresh_token
 
-        # Mock token record
+        # Mock token record and its user, loaded together
         mock_token_record = Mock()
         mock_token_record.user_uuid = "test-uuid"
-        mock_token_record.token_hash = "calculated_hash"
-        mock_repo.get_valid_token_by_jti.return_value = mock_token_record
+        mock_token_record.token_hash = b"calculated_hash"
+        mocks.repo.get_valid_token_and_user_by_jti.return_value = (mock_token_record, sample_user_db)
 
         # Mock hash calculation
-        mock_hash.return_value = "calculated_hash"
-
-        # Mock user
-        mock_user = User(
-            id=random.randint(1, 1000),
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            disabled=False,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
-        )
-        mock_get_user.return_value = mock_user
+        mocks.hash.return_value = b"calculated_hash"
 
-        result = verify_refresh_token(mock_db, token)
+        result = verify_refresh_token(mock_session, token)
 
         assert result is not None
         user, returned_jti = result
+        assert isinstance(user, User)
         assert user.uuid == "test-uuid"
+        assert 'hashed_password' not in user.model_dump()
         assert returned_jti == jti
+        mocks.repo.get_valid_token_and_user_by_jti.assert_called_once_with(mock_session, jti)
 
-    @patch('src.services.auth.RefreshTokenRepository')
-    def test_verify_refresh_token_invalid_jwt(self, mock_repo):
+    def test_verify_refresh_token_invalid_jwt(self, mock_session, mocks):
         """Should return None for invalid JWT."""
-        mock_db = Mock()
-
-        result = verify_refresh_token(mock_db, "invalid.token.here")
-
-        assert result is None
-        mock_repo.get_valid_token_by_jti.assert_not_called()
-
-    @patch('src.services.auth.RefreshTokenRepository')
-    def test_verify_refresh_token_wrong_type(self, mock_repo):
-        """Should return None when using access token."""
-        mock_db = Mock()
-
-        # Create an access token instead of refresh
-        access_token = create_access_token(data={"sub": "test-uuid"})
-
-        result = verify_refresh_token(mock_db, access_token)
+        result = verify_refresh_token(mock_session, "invalid.token.here")
 
         assert result is None
+        mocks.repo.get_valid_token_and_user_by_jti.assert_not_called()
 
-    @patch('src.services.auth.RefreshTokenRepository')
-    def test_verify_refresh_token_not_in_database(self, mock_repo):
-        """Should return None when token not found in database."""
-        mock_db = Mock()
-        token, _, _ = create_refresh_token(data={"sub": "test-uuid"})
-        mock_repo.get_valid_token_by_jti.return_value = None
+    @patch('src.services.auth.jwt.decode')
+    def test_verify_refresh_token_malformed_rejected_before_decode(self, mock_decode, mock_session, refresh_token):
+        """Should reject oversized tokens and tokens without three segments without decoding them."""
+        token, _, _ = refresh_token
 
-        result = verify_refresh_token(mock_db, token)
+        assert verify_refresh_token(mock_session, token + "a" * 5000) is None
+        assert verify_refresh_token(mock_session, "not-a-jwt") is None
+        assert verify_refresh_token(mock_session, token + ".extra") is None
+        mock_decode.assert_not_called()
 
-        assert result is None
-
-    @patch('src.services.auth.hash_token')
-    @patch('src.services.auth.RefreshTokenRepository')
-    def test_verify_refresh_token_hash_mismatch(self, mock_repo, mock_hash):
-        """Should return None when token hash doesn't match."""
-        mock_db = Mock()
-        token, _, _ = create_refresh_token(data={"sub": "test-uuid"})
-
-        mock_token_record = Mock()
-        mock_token_record.user_uuid = "test-uuid"
-        mock_token_record.token_hash = "stored_hash"
-        mock_repo.get_valid_token_by_jti.return_value = mock_token_record
-
-        mock_hash.return_value = "different_hash"
-
-        result = verify_refresh_token(mock_db, token)
-
-        assert result is None
-
-    @patch('src.services.auth.get_user_by_uuid')
-    @patch('src.services.auth.hash_token')
-    @patch('src.services.auth.RefreshTokenRepository')
-    def test_verify_refresh_token_user_not_found(self, mock_repo, mock_hash, mock_get_user):
-        """Should return None when user doesn't exist."""
-        mock_db = Mock()
-        token, _, _ = create_refresh_token(data={"sub": "test-uuid"})
-
-        mock_token_record = Mock()
-        mock_token_record.user_uuid = "test-uuid"
-        mock_token_record.token_hash = "hash"
-        mock_repo.get_valid_token_by_jti.return_value = mock_token_record
-
-        mock_hash.return_value = "hash"
-        mock_get_user.return_value = None
-
-        result = verify_refresh_token(mock_db, token)
+    def test_verify_refresh_token_wrong_type(self, mock_session, mocks, access_token):
+        """Should return None when using access token."""
+        # Use an access token instead of refresh
+        result = verify_refresh_token(mock_session, access_token)
 
         assert result is None
 
-    @patch('src.services.auth.get_user_by_uuid')
-    @patch('src.services.auth.hash_token')
-    @patch('src.services.auth.RefreshTokenRepository')
-    def test_verify_refresh_token_user_disabled(self, mock_repo, mock_hash, mock_get_user):
-        """Should return None when user is disabled."""
-        mock_db = Mock()
-        token, _, _ = create_refresh_token(data={"sub": "test-uuid"})
-
-        mock_token_record = Mock()
-        mock_token_record.user_uuid = "test-uuid"
-        mock_token_record.token_hash = "hash"
-        mock_repo.get_valid_token_by_jti.return_value = mock_token_record
-
-        mock_hash.return_value = "hash"
-
-        mock_user = User(
-            id=random.randint(1, 1000),
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            disabled=True,  # User is disabled
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
-        )
-        mock_get_user.return_value = mock_user
+    def test_verify_refresh_token_not_in_database(self, mock_session, mocks, refresh_token):
+        """Should return None when token (or its user) is not found in database."""
+        token, _, _ = refresh_token
+        mocks.repo.get_valid_token_and_user_by_jti.return_value = None
 
-        result = verify_refresh_token(mock_db, token)
+        result = verify_refresh_token(mock_session, token)
 
         assert result is None
 
-    @patch('src.services.auth.RefreshTokenRepository')
-    def test_verify_refresh_token_uuid_mismatch(self, mock_repo):
-        """Should return None when JWT subject doesn't match DB record."""
-        mock_db = Mock()
-        token, _, _ = create_refresh_token(data={"sub": "test-uuid"})
+    @pytest.mark.parametrize("record_uuid,stored_hash,disabled", [
+        ("test-uuid", b"stored_hash", False),
+        ("test-uuid", b"hash", True),
+        ("different-uuid", b"hash", False),
+    ], ids=["hash_mismatch", "user_disabled", "uuid_mismatch"])
+    def test_verify_refresh_token_rejected_record(self, mock_session, mocks, sample_user_db, refresh_token, record_uuid, stored_hash, disabled):
+        """Should return None when the DB record does not match the token or its user is disabled."""
+        token, _, _ = refresh_token
 
         mock_token_record = Mock()
-        mock_token_record.user_uuid = "different-uuid"  # Different from JWT
-        mock_repo.get_valid_token_by_jti.return_value = mock_token_record
+        mock_token_record.user_uuid = record_uuid
+        mock_token_record.token_hash = stored_hash
+        user_db = sample_user_db.model_copy(update={"disabled": True}) if disabled else sample_user_db
+        mocks.repo.get_valid_token_and_user_by_jti.return_value = (mock_token_record, user_db)
+        mocks.hash.return_value = b"hash"
 
-        result = verify_refresh_token(mock_db, token)
+        result = verify_refresh_token(mock_session, token)
 
         assert result is None
@@ -0,0 +1,82 @@
+"""Unit tests for the in-process TTL cache (src/utils/cache.py)."""
+from unittest.mock import patch
+
+from src.utils.cache import TTLCache
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_get_missing_returns_default(self):
+        """Should return default for unknown keys."""
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        assert cache.get("missing") is None
+        assert cache.get("missing", "default") == "default"
+
+    def test_set_and_get(self):
+        """Should return the stored value before it expires."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+
+    @patch('src.utils.cache.time.monotonic')
+    def test_entry_expires(self, mock_monotonic):
+        """Should drop entries once their ttl has elapsed."""
+        mock_monotonic.return_value = 100.0
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("key", "value")
+
+        mock_monotonic.return_value = 160.0
+
+        assert cache.get("key") is None
+        assert len(cache) == 0
+
+    @patch('src.utils.cache.time.monotonic')
+    def test_per_entry_ttl(self, mock_monotonic):
+        """Should honour a ttl given for a single entry."""
+        mock_monotonic.return_value = 100.0
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("short", "value", ttl=5)
+        cache.set("long", "value")
+
+        mock_monotonic.return_value = 110.0
+
+        assert cache.get("short") is None
+        assert cache.get("long") == "value"
+
+    def test_evicts_oldest_when_full(self):
+        """Should evict the oldest entry when maxsize is reached."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+
+    def test_pop_and_pop_where(self):
+        """Should remove single keys and keys whose value matches a predicate."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+
+        cache.pop("a")
+        cache.pop("missing")
+        cache.pop_where(lambda value: value > 2)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") is None
+
+    def test_clear(self):
+        """Should remove all entries."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+
+        cache.clear()
+
+        assert len(cache) == 0
@@ -0,0 +1,64 @@
+"""Unit tests for the refresh token cleanup job (src/jobs/cleanup_expired_tokens.py)."""
+import asyncio
+import logging
+import pytest
+from unittest.mock import patch
+from sqlalchemy.exc import OperationalError
+
+from src.jobs.cleanup_expired_tokens import purge_stale_tokens, run
+
+_OPERATIONAL_ERROR = OperationalError("DELETE FROM refresh_tokens", {}, Exception("connection refused"))
+
+
+class TestPurgeStaleTokens:
+    """Tests for purge_stale_tokens."""
+
+    @patch('src.jobs.cleanup_expired_tokens.Session')
+    @patch('src.jobs.cleanup_expired_tokens.RefreshTokenRepository')
+    def test_purge_runs_until_partial_batch(self, mock_repo, mock_session):
+        """Should keep deleting batches until one comes back smaller than batch_size."""
+        mock_repo.delete_stale_tokens_batch.side_effect = [10, 10, 3]
+
+        result = purge_stale_tokens(batch_size=10)
+
+        assert result == 23
+        assert mock_repo.delete_stale_tokens_batch.call_count == 3
+
+    @patch('src.jobs.cleanup_expired_tokens.Session')
+    @patch('src.jobs.cleanup_expired_tokens.RefreshTokenRepository')
+    def test_purge_nothing_to_delete(self, mock_repo, mock_session):
+        """Should stop after a single empty batch."""
+        mock_repo.delete_stale_tokens_batch.return_value = 0
+
+        result = purge_stale_tokens(batch_size=10)
+
+        assert result == 0
+        mock_repo.delete_stale_tokens_batch.assert_called_once()
+
+
+class TestRun:
+    """Tests for the cleanup schedule."""
+
+    @pytest.mark.asyncio
+    @patch('src.jobs.cleanup_expired_tokens.purge_stale_tokens')
+    async def test_run_logs_database_errors_and_continues(self, mock_purge, caplog):
+        """Should log a database error and purge again at the next interval."""
+        mock_purge.side_effect = [_OPERATIONAL_ERROR, 5, asyncio.CancelledError]
+
+        with caplog.at_level(logging.INFO, logger="src.jobs.cleanup_expired_tokens"):
+            with pytest.raises(asyncio.CancelledError):
+                await run(interval_hours=0)
+
+        assert mock_purge.call_count == 3
+        assert [record.levelno for record in caplog.records] == [logging.ERROR, logging.INFO]
+
+    @pytest.mark.asyncio
+    @patch('src.jobs.cleanup_expired_tokens.purge_stale_tokens')
+    async def test_run_propagates_programming_errors(self, mock_purge):
+        """Should not retry errors that are not database errors."""
+        mock_purge.side_effect = TypeError("bad argument")
+
+        with pytest.raises(TypeError):
+            await run(interval_hours=0)
+
+        mock_purge.assert_called_once()
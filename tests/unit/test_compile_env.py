@@ -0,0 +1,43 @@
+"""Unit tests for compiling .env into a module (src/compile_env.py)."""
+import runpy
+import pytest
+
+from src.compile_env import compile_env, read_env_file
+
+
+class TestReadEnvFile:
+    """Tests for read_env_file."""
+
+    def test_read_env_file(self, tmp_path):
+        """Should return every variable with a value, whatever its name."""
+        env_path = tmp_path / ".env"
+        env_path.write_text("DATABASE_URL=postgresql://db\nMixed_Case=1\nMY-VAR=2\nNO_VALUE\n")
+
+        assert read_env_file(str(env_path)) == {"DATABASE_URL": "postgresql://db", "Mixed_Case": "1", "MY-VAR": "2"}
+
+
+class TestCompileEnv:
+    """Tests for compile_env."""
+
+    def test_compile_env_round_trip(self, tmp_path):
+        """The compiled module should define the same variables as the .env file."""
+        env_path = tmp_path / ".env"
+        env_path.write_text("SECRET_KEY='a \"quoted\" value'\nMixed_Case=1\n")
+        output_path = tmp_path / "env_compiled.py"
+
+        count = compile_env(str(env_path), output_path)
+
+        compiled = runpy.run_path(str(output_path))
+        assert count == 2
+        assert {key: compiled[key] for key in ("SECRET_KEY", "Mixed_Case")} == read_env_file(str(env_path))
+
+    @pytest.mark.parametrize("key", ["1ST_KEY", "MY-VAR", "class", "__doc__"])
+    def test_compile_env_invalid_key(self, tmp_path, key):
+        """Should refuse keys that cannot become variables of the compiled module, writing nothing."""
+        env_path = tmp_path / ".env"
+        env_path.write_text(f"{key}=value\n")
+        output_path = tmp_path / "env_compiled.py"
+
+        with pytest.raises(ValueError, match="Invalid variable names"):
+            compile_env(str(env_path), output_path)
+        assert not output_path.exists()
@@ -0,0 +1,48 @@
+"""Unit tests for configuration loading (src/config.py)."""
+import os
+import sys
+import pytest
+
+from src.config import _load_env, get_settings
+
+
+@pytest.fixture(name="fresh_settings")
+def fresh_settings_fixture():
+    """Make get_settings read the environment again, and restore the cached settings afterwards."""
+    get_settings.cache_clear()
+    yield get_settings
+    get_settings.cache_clear()
+
+
+class TestLoadEnv:
+    """Tests for _load_env."""
+
+    def test_load_env_from_env_file(self, monkeypatch):
+        """Without a compiled module, should load every .env variable not already set."""
+        monkeypatch.setitem(sys.modules, "src.env_compiled", None)
+        monkeypatch.setattr("src.config.read_env_file", lambda: {"MY-VAR": "from-env-file", "PRESET": "from-env-file"})
+        monkeypatch.delenv("MY-VAR", raising=False)
+        monkeypatch.setenv("PRESET", "from-environment")
+
+        _load_env()
+
+        assert os.environ["MY-VAR"] == "from-env-file"
+        assert os.environ["PRESET"] == "from-environment"
+
+
+class TestGetSettings:
+    """Tests for get_settings."""
+
+    def test_get_settings(self, fresh_settings, monkeypatch):
+        """Should read the settings from the environment."""
+        monkeypatch.setenv("MAX_ACTIVE_TOKENS_PER_USER", "7")
+
+        assert fresh_settings().max_active_tokens_per_user == 7
+
+    @pytest.mark.parametrize("value", ["0", "-1"])
+    def test_get_settings_invalid_max_active_tokens(self, fresh_settings, monkeypatch, value):
+        """Should refuse a token limit that would leave no room for the new token."""
+        monkeypatch.setenv("MAX_ACTIVE_TOKENS_PER_USER", value)
+
+        with pytest.raises(ValueError, match="MAX_ACTIVE_TOKENS_PER_USER"):
+            fresh_settings()
@@ -1,178 +1,135 @@
 """Unit tests for dependencies (src/utils/dependencies.py)."""
 import pytest
-from unittest.mock import Mock, patch
-from datetime import datetime, timezone
+from unittest.mock import patch
+from datetime import timedelta
 from fastapi import HTTPException
 
-from src.utils.dependencies import get_current_user, get_current_active_user
+from src.utils.dependencies import _ACCESS_TOKEN_CACHE, get_current_user, get_current_active_user, invalidate_cached_user
 from src.services.auth import create_access_token, create_refresh_token
-from src.schemas.user import User
+
+# The dependencies do no real I/O, so every test in the module shares one event loop
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+USER_UUID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+@pytest.fixture(name="access_token", scope="module")
+def access_token_fixture():
+    """Valid access token for USER_UUID, shared by the tests that do not need a fresh one."""
+    return create_access_token(data={"sub": USER_UUID})
 
 
 class TestGetCurrentUser:
     """Tests for get_current_user dependency."""
 
-    @pytest.mark.asyncio
     @patch('src.utils.dependencies.get_user_by_uuid')
-    async def test_get_current_user_success(self, mock_get_user):
+    async def test_get_current_user_success(self, mock_get_user, mock_session, sample_user):
         """Should return user when token is valid."""
-        mock_session = Mock()
-        mock_user = User(
-            id=1,
-            uuid="550e8400-e29b-41d4-a716-446655440000",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            disabled=False,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
-        )
+        mock_user = sample_user.model_copy(update={"uuid": USER_UUID})
         mock_get_user.return_value = mock_user
 
         # Create valid access token
-        token = create_access_token(data={"sub": "550e8400-e29b-41d4-a716-446655440000"})
+        token = create_access_token(data={"sub": USER_UUID})
 
         result = await get_current_user(token=token, session=mock_session)
 
         assert result == mock_user
-        mock_get_user.assert_called_once_with(mock_session, uuid="550e8400-e29b-41d4-a716-446655440000")
-
-    @pytest.mark.asyncio
-    async def test_get_current_user_invalid_token(self):
-        """Should raise 401 for invalid token."""
-        mock_session = Mock()
+        mock_get_user.assert_called_once_with(mock_session, uuid=USER_UUID)
+
+    @pytest.mark.parametrize("make_token", [
+        lambda token: "invalid.token.here",
+        lambda token: create_refresh_token(data={"sub": USER_UUID})[0],
+        lambda token: create_access_token(data={}),
+        lambda token: create_access_token(data={"sub": "not-a-valid-uuid"}),
+        lambda token: create_access_token(data={"sub": USER_UUID}, expires_delta=timedelta(seconds=-1)),
+        lambda token: token.rsplit(".", 1)[0] + ".tampered_signature",
+        lambda token: token,
+    ], ids=["invalid_token", "refresh_token", "missing_sub", "invalid_uuid_format", "expired", "wrong_signature", "user_not_found"])
+    @patch('src.utils.dependencies.get_user_by_uuid')
+    async def test_get_current_user_rejected(self, mock_get_user, mock_session, make_token, access_token):
+        """Should raise 401 for unusable tokens and for tokens of users that do not exist."""
+        mock_get_user.return_value = None
 
         with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(token="invalid.token.here", session=mock_session)
+            await get_current_user(token=make_token(access_token), session=mock_session)
 
         assert exc_info.value.status_code == 401
         assert "Could not validate credentials" in exc_info.value.detail
 
-    @pytest.mark.asyncio
-    async def test_get_current_user_refresh_token_rejected(self):
-        """Should raise 401 when using refresh token instead of access token."""
-        mock_session = Mock()
-
-        # Create refresh token (wrong type)
-        refresh_token, _, _ = create_refresh_token(data={"sub": "550e8400-e29b-41d4-a716-446655440000"})
-
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(token=refresh_token, session=mock_session)
-
-        assert exc_info.value.status_code == 401
+    @patch('src.utils.dependencies.get_user_by_uuid')
+    async def test_get_current_user_cached(self, mock_get_user, mock_session, sample_user):
+        """Should reuse the verified user for repeated requests with the same token."""
+        mock_user = sample_user.model_copy(update={"uuid": USER_UUID})
+        mock_get_user.return_value = mock_user
+        token = create_access_token(data={"sub": USER_UUID})
 
-    @pytest.mark.asyncio
-    async def test_get_current_user_missing_sub(self):
-        """Should raise 401 when token has no subject."""
-        mock_session = Mock()
+        first = await get_current_user(token=token, session=mock_session)
+        second = await get_current_user(token=token, session=mock_session)
 
-        # Create token without sub
-        token = create_access_token(data={})
+        assert first == second == mock_user
+        mock_get_user.assert_called_once()
 
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(token=token, session=mock_session)
+    @patch('src.utils.dependencies.get_user_by_uuid')
+    async def test_get_current_user_cache_disabled(self, mock_get_user, mock_session, sample_user, monkeypatch):
+        """Should look the user up on every request when ACCESS_TOKEN_CACHE_SECONDS is 0."""
+        monkeypatch.setattr('src.utils.dependencies.ACCESS_TOKEN_CACHE_SECONDS', 0)
+        mock_get_user.return_value = sample_user.model_copy(update={"uuid": USER_UUID})
+        token = create_access_token(data={"sub": USER_UUID})
 
-        assert exc_info.value.status_code == 401
+        await get_current_user(token=token, session=mock_session)
+        await get_current_user(token=token, session=mock_session)
 
-    @pytest.mark.asyncio
-    async def test_get_current_user_invalid_uuid_format(self):
-        """Should raise 401 when UUID format is invalid."""
-        mock_session = Mock()
+        assert mock_get_user.call_count == 2
 
-        # Create token with invalid UUID
-        token = create_access_token(data={"sub": "not-a-valid-uuid"})
+    @patch('src.utils.dependencies.get_user_by_uuid')
+    async def test_get_current_user_cache_invalidated(self, mock_get_user, mock_session, sample_user):
+        """Should look the user up again after its cached entries are invalidated."""
+        mock_user = sample_user.model_copy(update={"uuid": USER_UUID})
+        mock_get_user.return_value = mock_user
+        token = create_access_token(data={"sub": USER_UUID})
 
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(token=token, session=mock_session)
+        await get_current_user(token=token, session=mock_session)
+        invalidate_cached_user(USER_UUID)
+        await get_current_user(token=token, session=mock_session)
 
-        assert exc_info.value.status_code == 401
+        assert mock_get_user.call_count == 2
 
-    @pytest.mark.asyncio
     @patch('src.utils.dependencies.get_user_by_uuid')
-    async def test_get_current_user_user_not_found(self, mock_get_user):
-        """Should raise 401 when user doesn't exist."""
-        mock_session = Mock()
+    async def test_get_current_user_rejection_cached(self, mock_get_user, mock_session):
+        """Should reject a repeated unknown-user token without querying again."""
         mock_get_user.return_value = None
+        token = create_access_token(data={"sub": USER_UUID})
 
-        token = create_access_token(data={"sub": "550e8400-e29b-41d4-a716-446655440000"})
+        for _ in range(2):
+            with pytest.raises(HTTPException) as exc_info:
+                await get_current_user(token=token, session=mock_session)
+            assert exc_info.value.status_code == 401
 
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(token=token, session=mock_session)
+        mock_get_user.assert_called_once()
 
-        assert exc_info.value.status_code == 401
-
-    @pytest.mark.asyncio
-    async def test_get_current_user_expired_token(self):
-        """Should raise 401 for expired token."""
-        mock_session = Mock()
+    async def test_get_current_user_invalid_token_not_cached(self, mock_session):
+        """Should not cache tokens that fail verification, so they cannot evict verified users."""
+        for index in range(3):
+            with pytest.raises(HTTPException):
+                await get_current_user(token=f"invalid.token.{index}", session=mock_session)
 
-        # Create expired token
-        from datetime import timedelta
-        token = create_access_token(
-            data={"sub": "550e8400-e29b-41d4-a716-446655440000"},
-            expires_delta=timedelta(seconds=-1)  # Already expired
-        )
-
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(token=token, session=mock_session)
-
-        assert exc_info.value.status_code == 401
-
-    @pytest.mark.asyncio
-    async def test_get_current_user_wrong_signature(self):
-        """Should raise 401 for token with wrong signature."""
-        mock_session = Mock()
-
-        # Create token and tamper with it
-        token = create_access_token(data={"sub": "550e8400-e29b-41d4-a716-446655440000"})
-        # Modify the signature part
-        parts = token.split('.')
-        parts[2] = 'tampered_signature'
-        tampered_token = '.'.join(parts)
-
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(token=tampered_token, session=mock_session)
-
-        assert exc_info.value.status_code == 401
+        assert len(_ACCESS_TOKEN_CACHE) == 0
 
 
 class TestGetCurrentActiveUser:
     """Tests for get_current_active_user dependency."""
 
-    @pytest.mark.asyncio
-    async def test_get_current_active_user_success(self):
+    async def test_get_current_active_user_success(self, sample_user):
         """Should return user when user is active."""
-        mock_user = User(
-            id=1,
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            disabled=False,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
-        )
+        mock_user = sample_user
 
         result = await get_current_active_user(current_user=mock_user)
 
         assert result == mock_user
 
-    @pytest.mark.asyncio
-    async def test_get_current_active_user_disabled(self):
+    async def test_get_current_active_user_disabled(self, sample_user):
         """Should raise 403 when user is disabled."""
-        mock_user = User(
-            id=1,
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            disabled=True,  # User is disabled
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
-        )
+        mock_user = sample_user.model_copy(update={"disabled": True})  # User is disabled
 
         with pytest.raises(HTTPException) as exc_info:
             await get_current_active_user(current_user=mock_user)
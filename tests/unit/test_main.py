@@ -0,0 +1,96 @@
+"""Unit tests for the deferred startup (src/main.py)."""
+import asyncio
+import logging
+import pytest
+from functools import partial
+from types import SimpleNamespace
+from unittest.mock import Mock
+from sqlalchemy.exc import OperationalError
+
+from src import main
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+_OPERATIONAL_ERROR = OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+
+@pytest.fixture(name="app")
+def app_fixture():
+    """Stand-in for the FastAPI app: _deferred_init only touches app.state."""
+    return SimpleNamespace(state=SimpleNamespace(ready=False))
+
+
+@pytest.fixture(name="create_tables")
+def create_tables_fixture(monkeypatch):
+    """Stand-in for create_db_and_tables, with retries made immediate."""
+    create_tables = Mock()
+    monkeypatch.setattr(main, "create_db_and_tables", create_tables)
+    monkeypatch.setattr(main, "INIT_RETRY_SECONDS", 0)
+    return create_tables
+
+
+class TestDeferredInit:
+    """Tests for _deferred_init."""
+
+    async def test_deferred_init_ready(self, app, create_tables):
+        """Should create the tables and mark the app ready."""
+        await main._deferred_init(app)
+
+        assert app.state.ready is True
+        create_tables.assert_called_once()
+
+    async def test_deferred_init_retries_database_errors(self, app, create_tables, caplog):
+        """Should log database errors and retry until the tables are created."""
+        create_tables.side_effect = [_OPERATIONAL_ERROR, _OPERATIONAL_ERROR, None]
+
+        with caplog.at_level(logging.ERROR, logger="src.main"):
+            await main._deferred_init(app)
+
+        assert app.state.ready is True
+        assert create_tables.call_count == 3
+        assert len(caplog.records) == 2
+
+    async def test_unexpected_error_logged(self, app, create_tables, caplog):
+        """Should log errors that end the startup task instead of losing them."""
+        create_tables.side_effect = RuntimeError("boom")
+        task = asyncio.create_task(main._deferred_init(app))
+        task.add_done_callback(partial(main._log_task_failure, "Startup failed"))
+
+        with caplog.at_level(logging.ERROR, logger="src.main"):
+            with pytest.raises(RuntimeError):
+                await task
+            await asyncio.sleep(0)
+
+        assert app.state.ready is False
+        assert "Startup failed" in caplog.text
+
+
+class TestLogTaskFailure:
+    """Tests for _log_task_failure."""
+
+    async def test_log_task_failure(self, caplog):
+        """Should log the error that ended the task with the given message."""
+        async def fail():
+            raise RuntimeError("boom")
+
+        task = asyncio.create_task(fail())
+        with pytest.raises(RuntimeError):
+            await task
+
+        with caplog.at_level(logging.ERROR, logger="src.main"):
+            main._log_task_failure("Refresh token cleanup stopped", task)
+
+        assert "Refresh token cleanup stopped" in caplog.text
+        assert "boom" in caplog.text
+
+    async def test_log_task_failure_cancelled(self, caplog):
+        """Should not log tasks that were cancelled, e.g. at shutdown."""
+        task = asyncio.create_task(asyncio.sleep(3600))
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        with caplog.at_level(logging.ERROR, logger="src.main"):
+            main._log_task_failure("Refresh token cleanup stopped", task)
+
+        assert caplog.records == []
@@ -1,68 +1,72 @@
 """Unit tests for refresh token repository (src/repositories/refresh_token_repository.py)."""
-from unittest.mock import Mock, patch
+import pytest
+import re
+from types import SimpleNamespace
 from datetime import datetime, timezone, timedelta
+from sqlalchemy.dialects import postgresql
 
 from src.repositories.refresh_token_repository import RefreshTokenRepository
 from src.database.models import RefreshTokenDB
 
+# Fixed far-future expiry: the repository never compares it, so no clock read is needed
+_EXPIRES = datetime(2099, 1, 1, tzinfo=timezone.utc)
+
+
+def make_token(**overrides) -> RefreshTokenDB:
+    """Build an active refresh token row, with fields overridden as needed."""
+    fields = {
+        "id": 1,
+        "jti": "test-jti",
+        "token_hash": b"hash",
+        "user_uuid": "user-uuid",
+        "expires_at": _EXPIRES,
+        "revoked": False,
+        **overrides,
+    }
+    return RefreshTokenDB(**fields)
+
 
 class TestRefreshTokenRepositoryGetByJti:
     """Tests for RefreshTokenRepository.get_by_jti."""
 
-    def test_get_by_jti_found(self):
+    def test_get_by_jti_found(self, mock_session):
         """Should return token when found."""
-        mock_db = Mock()
-        mock_token = RefreshTokenDB(
-            id=1,
-            jti="test-jti",
-            token_hash="hash",
-            user_uuid="user-uuid",
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7),
-            revoked=False
-        )
-        mock_db.exec.return_value.first.return_value = mock_token
+        mock_token = make_token()
+        mock_session.exec.return_value = SimpleNamespace(first=lambda: mock_token)
 
-        result = RefreshTokenRepository.get_by_jti(mock_db, "test-jti")
+        result = RefreshTokenRepository.get_by_jti(mock_session, "test-jti")
 
         assert result == mock_token
-        mock_db.exec.assert_called_once()
+        mock_session.exec.assert_called_once()
 
-    def test_get_by_jti_not_found(self):
-        """Should return None when token not found."""
-        mock_db = Mock()
-        mock_db.exec.return_value.first.return_value = None
 
-        result = RefreshTokenRepository.get_by_jti(mock_db, "nonexistent")
+class TestRefreshTokenRepositoryGetValidTokenAndUserByJti:
+    """Tests for RefreshTokenRepository.get_valid_token_and_user_by_jti."""
 
-        assert result is None
+    def test_get_valid_token_and_user_found(self, mock_session, sample_user_db):
+        """Should return the token and its user from a single query."""
+        mock_token = make_token()
+        mock_user = sample_user_db
+        mock_session.exec.return_value = SimpleNamespace(first=lambda: (mock_token, mock_user))
 
+        result = RefreshTokenRepository.get_valid_token_and_user_by_jti(mock_session, "test-jti")
 
-class TestRefreshTokenRepositoryGetValidTokenByJti:
-    """Tests for RefreshTokenRepository.get_valid_token_by_jti."""
+        assert result == (mock_token, mock_user)
+        mock_session.exec.assert_called_once()
 
-    def test_get_valid_token_found(self):
-        """Should return token when valid (not expired, not revoked)."""
-        mock_db = Mock()
-        mock_token = RefreshTokenDB(
-            id=1,
-            jti="test-jti",
-            token_hash="hash",
-            user_uuid="user-uuid",
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7),
-            revoked=False
-        )
-        mock_db.exec.return_value.first.return_value = mock_token
 
-        result = RefreshTokenRepository.get_valid_token_by_jti(mock_db, "test-jti")
+class TestRefreshTokenRepositoryLookupNotFound:
+    """Tests for the JTI lookups when no (valid) token matches."""
 
-        assert result == mock_token
-
-    def test_get_valid_token_not_found(self):
-        """Should return None when no valid token found."""
-        mock_db = Mock()
-        mock_db.exec.return_value.first.return_value = None
+    @pytest.mark.parametrize("lookup", [
+        RefreshTokenRepository.get_by_jti,
+        RefreshTokenRepository.get_valid_token_and_user_by_jti,
+    ], ids=["get_by_jti", "get_valid_token_and_user_by_jti"])
+    def test_lookup_not_found(self, mock_session, lookup):
+        """Should return None when the query finds no row."""
+        mock_session.exec.return_value = SimpleNamespace(first=lambda: None)
 
-        result = RefreshTokenRepository.get_valid_token_by_jti(mock_db, "test-jti")
+        result = lookup(mock_session, "nonexistent")
 
         assert result is None
 
@@ -70,22 +74,19 @@ class TestRefreshTokenRepositoryGetValidTokenByJti:
 class TestRefreshTokenRepositoryCreate:
     """Tests for RefreshTokenRepository.create."""
 
-    def test_create_token(self):
+    def test_create_token(self, mock_session):
         """Should create and return new token."""
-        mock_db = Mock()
-        expires = datetime.now(timezone.utc) + timedelta(days=7)
-
         result = RefreshTokenRepository.create(
-            mock_db,
+            mock_session,
             jti="new-jti",
-            token_hash="hash",
+            token_hash=b"hash",
             user_uuid="user-uuid",
-            expires_at=expires
+            expires_at=_EXPIRES
         )
 
-        mock_db.add.assert_called_once()
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once()
+        mock_session.add.assert_called_once()
+        mock_session.commit.assert_called_once()
+        mock_session.refresh.assert_called_once()
         assert result.jti == "new-jti"
         assert result.user_uuid == "user-uuid"
 
@@ -93,106 +94,138 @@ class TestRefreshTokenRepositoryCreate:
 class TestRefreshTokenRepositoryRevoke:
     """Tests for RefreshTokenRepository.revoke."""
 
-    def test_revoke_token(self):
+    def test_revoke_token(self, mock_session):
         """Should set revoked=True and revoked_at."""
-        mock_db = Mock()
-        token = RefreshTokenDB(
-            id=1,
-            jti="test-jti",
-            token_hash="hash",
-            user_uuid="user-uuid",
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7),
-            revoked=False
-        )
+        token = make_token()
 
-        RefreshTokenRepository.revoke(mock_db, token)
+        RefreshTokenRepository.revoke(mock_session, token)
 
         assert token.revoked is True
         assert token.revoked_at is not None
-        mock_db.add.assert_called_once_with(token)
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once_with(token)
+        mock_session.add.assert_called_once_with(token)
+        mock_session.commit.assert_called_once()
+        mock_session.refresh.assert_called_once_with(token)
+
+
+class TestRefreshTokenRepositoryCreateWithinLimit:
+    """Tests for RefreshTokenRepository.create_within_limit."""
+
+    def test_create_within_limit(self, mock_session):
+        """Should insert the token in one statement, commit and return its JTI without reloading it."""
+        mock_session.exec.return_value = SimpleNamespace(scalar_one=lambda: "new-jti")
+
+        result = RefreshTokenRepository.create_within_limit(
+            mock_session,
+            jti="new-jti",
+            token_hash=b"hash",
+            user_uuid="user-uuid",
+            expires_at=_EXPIRES,
+            max_active=3
+        )
+
+        assert result == "new-jti"
+        mock_session.exec.assert_called_once()
+        mock_session.commit.assert_called_once()
+        mock_session.refresh.assert_not_called()
+
+    def test_create_within_limit_statement(self, mock_session):
+        """Should revoke all but the newest max_active - 1 active tokens in a CTE of the INSERT."""
+        mock_session.exec.return_value = SimpleNamespace(scalar_one=lambda: "new-jti")
+
+        RefreshTokenRepository.create_within_limit(
+            mock_session,
+            jti="new-jti",
+            token_hash=b"hash",
+            user_uuid="user-uuid",
+            expires_at=_EXPIRES,
+            max_active=3
+        )
+
+        compiled = mock_session.exec.call_args.args[0].compile(dialect=postgresql.dialect())
+        sql = " ".join(str(compiled).split())
+        assert sql.startswith("WITH revoke_excess AS (UPDATE refresh_tokens SET revoked=")
+        assert "revoked_at=now() WHERE refresh_tokens.id IN (SELECT refresh_tokens.id FROM refresh_tokens" in sql
+        assert "refresh_tokens.revoked IS false AND refresh_tokens.expires_at > now()" in sql
+        assert "ORDER BY refresh_tokens.created_at DESC LIMIT ALL OFFSET" in sql
+        assert "FOR UPDATE) RETURNING refresh_tokens.id) INSERT INTO refresh_tokens" in sql
+        assert sql.endswith("RETURNING refresh_tokens.jti")
+        # The newest max_active - 1 tokens are kept, making room for the inserted one
+        offset_param = re.search(r"OFFSET %\((\w+)\)s", sql).group(1)
+        assert compiled.params[offset_param] == 2
 
 
 class TestRefreshTokenRepositoryRevokeByJti:
     """Tests for RefreshTokenRepository.revoke_by_jti."""
 
-    @patch.object(RefreshTokenRepository, 'get_by_jti')
-    def test_revoke_by_jti_success(self, mock_get):
+    def test_revoke_by_jti_success(self, mock_session):
         """Should revoke token and return True."""
-        mock_db = Mock()
-        token = RefreshTokenDB(
-            id=1,
-            jti="test-jti",
-            token_hash="hash",
-            user_uuid="user-uuid",
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7),
-            revoked=False
-        )
-        mock_get.return_value = token
+        mock_session.exec.return_value = SimpleNamespace(rowcount=1)
 
-        result = RefreshTokenRepository.revoke_by_jti(mock_db, "test-jti")
+        result = RefreshTokenRepository.revoke_by_jti(mock_session, "test-jti")
 
         assert result is True
-        assert token.revoked is True
-        mock_db.add.assert_called_once_with(token)
-        mock_db.commit.assert_called_once()
+        mock_session.exec.assert_called_once()
+        mock_session.commit.assert_called_once()
 
-    @patch.object(RefreshTokenRepository, 'get_by_jti')
-    def test_revoke_by_jti_not_found(self, mock_get):
-        """Should return False when token not found."""
-        mock_db = Mock()
-        mock_get.return_value = None
+    def test_revoke_by_jti_without_commit(self, mock_session):
+        """Should leave the commit to the caller when commit=False."""
+        mock_session.exec.return_value = SimpleNamespace(rowcount=1)
 
-        result = RefreshTokenRepository.revoke_by_jti(mock_db, "nonexistent")
+        result = RefreshTokenRepository.revoke_by_jti(mock_session, "test-jti", commit=False)
+
+        assert result is True
+        mock_session.commit.assert_not_called()
+
+    def test_revoke_by_jti_not_found_or_already_revoked(self, mock_session):
+        """Should return False when no active token matches the JTI."""
+        mock_session.exec.return_value = SimpleNamespace(rowcount=0)
+
+        result = RefreshTokenRepository.revoke_by_jti(mock_session, "nonexistent")
 
         assert result is False
-        mock_db.add.assert_not_called()
-
-    @patch.object(RefreshTokenRepository, 'get_by_jti')
-    def test_revoke_by_jti_already_revoked(self, mock_get):
-        """Should return False when token already revoked."""
-        mock_db = Mock()
-        token = RefreshTokenDB(
-            id=1,
-            jti="test-jti",
-            token_hash="hash",
-            user_uuid="user-uuid",
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7),
-            revoked=True  # Already revoked
-        )
-        mock_get.return_value = token
+        mock_session.add.assert_not_called()
+
+
+class TestRefreshTokenRepositoryRevokeByTokenHash:
+    """Tests for RefreshTokenRepository.revoke_by_token_hash."""
 
-        result = RefreshTokenRepository.revoke_by_jti(mock_db, "test-jti")
+    def test_revoke_by_token_hash_success(self, mock_session):
+        """Should revoke the matching token and return True."""
+        mock_session.exec.return_value = SimpleNamespace(rowcount=1)
+
+        result = RefreshTokenRepository.revoke_by_token_hash(mock_session, b"hash")
+
+        assert result is True
+        mock_session.exec.assert_called_once()
+        mock_session.commit.assert_called_once()
+
+    def test_revoke_by_token_hash_not_found(self, mock_session):
+        """Should return False when no valid token has the given hash."""
+        mock_session.exec.return_value = SimpleNamespace(rowcount=0)
+
+        result = RefreshTokenRepository.revoke_by_token_hash(mock_session, b"unknown")
 
         assert result is False
-        mock_db.add.assert_not_called()
 
 
 class TestRefreshTokenRepositoryRevokeAllForUser:
     """Tests for RefreshTokenRepository.revoke_all_for_user."""
 
-    def test_revoke_all_for_user(self):
+    def test_revoke_all_for_user(self, mock_session):
         """Should revoke all tokens and return count."""
-        mock_db = Mock()
-        mock_result = Mock()
-        mock_result.rowcount = 3
-        mock_db.exec.return_value = mock_result
+        mock_session.exec.return_value = SimpleNamespace(rowcount=3)
 
-        result = RefreshTokenRepository.revoke_all_for_user(mock_db, "user-uuid")
+        result = RefreshTokenRepository.revoke_all_for_user(mock_session, "user-uuid")
 
         assert result == 3
-        mock_db.exec.assert_called_once()
-        mock_db.commit.assert_called_once()
+        mock_session.exec.assert_called_once()
+        mock_session.commit.assert_called_once()
 
-    def test_revoke_all_for_user_none(self):
+    def test_revoke_all_for_user_none(self, mock_session):
         """Should return 0 when no tokens to revoke."""
-        mock_db = Mock()
-        mock_result = Mock()
-        mock_result.rowcount = 0
-        mock_db.exec.return_value = mock_result
+        mock_session.exec.return_value = SimpleNamespace(rowcount=0)
 
-        result = RefreshTokenRepository.revoke_all_for_user(mock_db, "user-uuid")
+        result = RefreshTokenRepository.revoke_all_for_user(mock_session, "user-uuid")
 
         assert result == 0
 
@@ -200,71 +233,46 @@ class TestRefreshTokenRepositoryRevokeAllForUser:
 class TestRefreshTokenRepositoryDeleteExpiredTokens:
     """Tests for RefreshTokenRepository.delete_expired_tokens."""
 
-    def test_delete_expired_tokens(self):
+    def test_delete_expired_tokens(self, mock_session):
         """Should delete expired tokens and return count."""
-        mock_db = Mock()
-        mock_result = Mock()
-        mock_result.rowcount = 5
-        mock_db.exec.return_value = mock_result
+        mock_session.exec.return_value = SimpleNamespace(rowcount=5)
 
-        result = RefreshTokenRepository.delete_expired_tokens(mock_db)
+        result = RefreshTokenRepository.delete_expired_tokens(mock_session)
 
         assert result == 5
-        mock_db.exec.assert_called_once()
-        mock_db.commit.assert_called_once()
+        mock_session.exec.assert_called_once()
+        mock_session.commit.assert_called_once()
+
+
+class TestRefreshTokenRepositoryDeleteStaleTokensBatch:
+    """Tests for RefreshTokenRepository.delete_stale_tokens_batch."""
+
+    def test_delete_stale_tokens_batch(self, mock_session):
+        """Should delete one batch and return its count."""
+        mock_session.exec.return_value = SimpleNamespace(rowcount=2)
+
+        result = RefreshTokenRepository.delete_stale_tokens_batch(mock_session, 1000, timedelta(days=7))
+
+        assert result == 2
+        mock_session.exec.assert_called_once()
+        mock_session.commit.assert_called_once()
 
 
 class TestRefreshTokenRepositoryCountActiveTokensForUser:
     """Tests for RefreshTokenRepository.count_active_tokens_for_user."""
 
-    def test_count_active_tokens(self):
+    def test_count_active_tokens(self, mock_session):
         """Should return count of active tokens."""
-        mock_db = Mock()
-        mock_db.exec.return_value.one.return_value = 3
+        mock_session.exec.return_value = SimpleNamespace(one=lambda: 3)
 
-        result = RefreshTokenRepository.count_active_tokens_for_user(mock_db, "user-uuid")
+        result = RefreshTokenRepository.count_active_tokens_for_user(mock_session, "user-uuid")
 
         assert result == 3
 
-    def test_count_active_tokens_zero(self):
+    def test_count_active_tokens_zero(self, mock_session):
         """Should return 0 when no active tokens."""
-        mock_db = Mock()
-        mock_db.exec.return_value.one.return_value = 0
+        mock_session.exec.return_value = SimpleNamespace(one=lambda: 0)
 
-        result = RefreshTokenRepository.count_active_tokens_for_user(mock_db, "user-uuid")
+        result = RefreshTokenRepository.count_active_tokens_for_user(mock_session, "user-uuid")
 
         assert result == 0
-
-
-class TestRefreshTokenRepositoryRevokeOldestTokens:
-    """Tests for RefreshTokenRepository.revoke_oldest_tokens."""
-
-    def test_revoke_oldest_token_success(self):
-        """Should revoke oldest token and return True."""
-        mock_db = Mock()
-        oldest_token = RefreshTokenDB(
-            id=1,
-            jti="oldest-jti",
-            token_hash="hash",
-            user_uuid="user-uuid",
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7),
-            revoked=False
-        )
-        mock_db.exec.return_value.first.return_value = oldest_token
-
-        result = RefreshTokenRepository.revoke_oldest_tokens(mock_db, "user-uuid")
-
-        assert result is True
-        assert oldest_token.revoked is True
-        mock_db.add.assert_called_once_with(oldest_token)
-        mock_db.commit.assert_called_once()
-
-    def test_revoke_oldest_token_none_found(self):
-        """Should return False when no active tokens found."""
-        mock_db = Mock()
-        mock_db.exec.return_value.first.return_value = None
-
-        result = RefreshTokenRepository.revoke_oldest_tokens(mock_db, "user-uuid")
-
-        assert result is False
-        mock_db.add.assert_not_called()
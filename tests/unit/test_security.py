@@ -1,76 +1,84 @@
 """Unit tests for security utilities (src/utils/security.py)."""
+import pytest
+from unittest.mock import patch
 
-from src.utils.security import get_password_hash, verify_password, hash_token
+from src.utils.security import get_password_hash, verify_password, hash_token, password_hash
+
+PASSWORD = "SecurePassword123!"
+
+
+@pytest.fixture(name="hashed_password", scope="module")
+def hashed_password_fixture():
+    """Argon2 hash of PASSWORD, computed once for the tests that only read or verify it."""
+    return get_password_hash(PASSWORD)
 
 
 class TestPasswordHashing:
     """Tests for password hashing functions."""
 
-    def test_hash_password_returns_hash(self):
+    def test_hash_password_returns_hash(self, hashed_password):
         """Hash should return a non-empty string different from input."""
-        password = "SecurePassword123!"
-        hashed = get_password_hash(password)
-
-        assert hashed is not None
-        assert isinstance(hashed, str)
-        assert hashed != password
-        assert len(hashed) > 0
+        assert hashed_password is not None
+        assert isinstance(hashed_password, str)
+        assert hashed_password != PASSWORD
+        assert len(hashed_password) > 0
 
     def test_hash_password_different_each_time(self):
         """Same password should produce different hashes (salt)."""
-        password = "SecurePassword123!"
-        hash1 = get_password_hash(password)
-        hash2 = get_password_hash(password)
+        hash1 = get_password_hash(PASSWORD)
+        hash2 = get_password_hash(PASSWORD)
 
         assert hash1 != hash2
 
-    def test_verify_password_correct(self):
+    def test_verify_password_correct(self, hashed_password):
         """Correct password should verify successfully."""
-        password = "SecurePassword123!"
-        hashed = get_password_hash(password)
-
-        assert verify_password(password, hashed) is True
+        assert verify_password(PASSWORD, hashed_password) is True
 
-    def test_verify_password_incorrect(self):
+    def test_verify_password_incorrect(self, hashed_password):
         """Incorrect password should fail verification."""
-        password = "SecurePassword123!"
-        hashed = get_password_hash(password)
-
-        assert verify_password("WrongPassword456!", hashed) is False
+        assert verify_password("WrongPassword456!", hashed_password) is False
 
-    def test_verify_password_empty(self):
+    def test_verify_password_empty(self, hashed_password):
         """Empty password should fail verification."""
-        password = "SecurePassword123!"
-        hashed = get_password_hash(password)
+        assert verify_password("", hashed_password) is False
 
-        assert verify_password("", hashed) is False
+    def test_verify_password_success_cached(self, hashed_password):
+        """Repeated successful verification should not rerun Argon2."""
+        with patch.object(password_hash, 'verify', wraps=password_hash.verify) as mock_verify:
+            assert verify_password(PASSWORD, hashed_password) is True
+            assert verify_password(PASSWORD, hashed_password) is True
 
-    def test_hash_contains_algorithm_identifier(self):
-        """Hash should contain argon2id identifier."""
-        password = "SecurePassword123!"
-        hashed = get_password_hash(password)
+        mock_verify.assert_called_once()
+
+    def test_verify_password_failure_not_cached(self, hashed_password):
+        """Failed verifications should always rerun Argon2."""
+        with patch.object(password_hash, 'verify', wraps=password_hash.verify) as mock_verify:
+            assert verify_password("WrongPassword456!", hashed_password) is False
+            assert verify_password("WrongPassword456!", hashed_password) is False
 
-        assert "$argon2" in hashed
+        assert mock_verify.call_count == 2
+
+    def test_hash_contains_algorithm_identifier(self, hashed_password):
+        """Hash should contain argon2id identifier."""
+        assert "$argon2" in hashed_password
 
 
 class TestTokenHashing:
     """Tests for token hashing function."""
 
-    def test_hash_token_returns_hex(self):
-        """Token hash should return hex string."""
+    def test_hash_token_returns_digest(self):
+        """Token hash should return the raw digest bytes."""
         token = "some.jwt.token"
         hashed = hash_token(token)
 
-        assert isinstance(hashed, str)
-        assert len(hashed) == 64  # SHA256 produces 64 hex characters
+        assert isinstance(hashed, bytes)
+        assert len(hashed) == 32  # SHA256 produces 32 bytes
 
     def test_hash_token_deterministic(self):
-        """Same token should produce same hash."""
-        token = "some.jwt.token"
-        hash1 = hash_token(token)
-        hash2 = hash_token(token)
+        """Same token should always produce the same (SHA256) hash."""
+        expected = bytes.fromhex("89602e27a9e5011221c5a2765b591725cecdda82ab3035be06115c98637acc94")
 
-        assert hash1 == hash2
+        assert hash_token("some.jwt.token") == expected
 
     def test_hash_token_different_tokens(self):
         """Different tokens should produce different hashes."""
@@ -1,119 +1,90 @@
 """Unit tests for user service (src/services/user.py)."""
-from unittest.mock import Mock, patch
+import pytest
+from unittest.mock import Mock
 from datetime import datetime, timezone
 from sqlalchemy.exc import IntegrityError
 
 from src.services.user import get_user, get_user_by_uuid, add_user, deactivate_user
-from src.database.models import UserDB
 from src.schemas.user import User, UserInDB
 
+# Raised by the mocked repository for duplicate users, built once
+_INTEGRITY_ERROR = IntegrityError("INSERT INTO users", {}, Exception("duplicate key"))
+
+
+@pytest.fixture(name="mock_repo")
+def mock_repo_fixture(monkeypatch):
+    """Stand-in for the UserRepository used by the user service; create returns the row it is given."""
+    mock_repo = Mock()
+    mock_repo.create.side_effect = lambda session, user, **kwargs: user
+    monkeypatch.setattr('src.services.user.UserRepository', mock_repo)
+    return mock_repo
+
+
+@pytest.fixture(name="mock_hash")
+def mock_hash_fixture(monkeypatch):
+    """Stand-in for get_password_hash, returning a fixed hash."""
+    mock_hash = Mock(return_value="hashed_password")
+    monkeypatch.setattr('src.services.user.get_password_hash', mock_hash)
+    return mock_hash
 
 class TestGetUser:
     """Tests for get_user function."""
 
-    @patch('src.services.user.UserRepository')
-    def test_get_user_found(self, mock_repo):
+    def test_get_user_found(self, mock_session, mock_repo, sample_user_db):
         """Should return UserInDB when user exists."""
-        mock_db = Mock()
-        mock_user_db = UserDB(
-            id=1,
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            hashed_password="hashed_password",
-            disabled=False,
-            created_at=datetime.now(timezone.utc)
-        )
-        mock_repo.get_by_username.return_value = mock_user_db
+        mock_repo.get_by_username.return_value = sample_user_db
 
-        result = get_user(mock_db, "testuser")
+        result = get_user(mock_session, "testuser")
 
         assert result is not None
         assert isinstance(result, UserInDB)
         assert result.username == "testuser"
         assert result.hashed_password == "hashed_password"
-        mock_repo.get_by_username.assert_called_once_with(mock_db, "testuser")
+        mock_repo.get_by_username.assert_called_once_with(mock_session, "testuser")
 
-    @patch('src.services.user.UserRepository')
-    def test_get_user_not_found(self, mock_repo):
+    def test_get_user_not_found(self, mock_session, mock_repo):
         """Should return None when user doesn't exist."""
-        mock_db = Mock()
         mock_repo.get_by_username.return_value = None
 
-        result = get_user(mock_db, "nonexistent")
+        result = get_user(mock_session, "nonexistent")
 
         assert result is None
-        mock_repo.get_by_username.assert_called_once_with(mock_db, "nonexistent")
+        mock_repo.get_by_username.assert_called_once_with(mock_session, "nonexistent")
 
 
 class TestGetUserByUuid:
     """Tests for get_user_by_uuid function."""
 
-    @patch('src.services.user.UserRepository')
-    def test_get_user_by_uuid_found(self, mock_repo):
+    def test_get_user_by_uuid_found(self, mock_session, mock_repo, sample_user_db):
         """Should return User (without password) when user exists."""
-        mock_db = Mock()
-        mock_user_db = UserDB(
-            id=1,
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            hashed_password="hashed_password",
-            disabled=False,
-            created_at=datetime.now(timezone.utc)
-        )
-        mock_repo.get_by_uuid.return_value = mock_user_db
+        mock_repo.get_by_uuid.return_value = sample_user_db
 
-        result = get_user_by_uuid(mock_db, "test-uuid")
+        result = get_user_by_uuid(mock_session, "test-uuid")
 
         assert result is not None
         assert isinstance(result, User)
         assert result.uuid == "test-uuid"
         assert 'hashed_password' not in result.model_dump()
-        mock_repo.get_by_uuid.assert_called_once_with(mock_db, "test-uuid")
+        mock_repo.get_by_uuid.assert_called_once_with(mock_session, "test-uuid")
 
-    @patch('src.services.user.UserRepository')
-    def test_get_user_by_uuid_not_found(self, mock_repo):
+    def test_get_user_by_uuid_not_found(self, mock_session, mock_repo):
         """Should return None when user doesn't exist."""
-        mock_db = Mock()
         mock_repo.get_by_uuid.return_value = None
 
-        result = get_user_by_uuid(mock_db, "nonexistent-uuid")
+        result = get_user_by_uuid(mock_session, "nonexistent-uuid")
 
         assert result is None
-        mock_repo.get_by_uuid.assert_called_once_with(mock_db, "nonexistent-uuid")
+        mock_repo.get_by_uuid.assert_called_once_with(mock_session, "nonexistent-uuid")
 
 
 class TestAddUser:
     """Tests for add_user function."""
 
-    @patch('src.services.user.UserRepository')
-    @patch('src.services.user.get_password_hash')
-    def test_add_user_success(self, mock_hash, mock_repo):
+    def test_add_user_success(self, mock_session, mock_repo, mock_hash):
         """Should create user and return UserDB."""
-        mock_db = Mock()
-        mock_hash.return_value = "hashed_password"
-
-        # Mock the created user
-        created_user = UserDB(
-            id=1,
-            uuid="new-uuid",
-            username="newuser",
-            email="new@example.com",
-            first_name="New",
-            last_name="User",
-            hashed_password="hashed_password",
-            disabled=False,
-            created_at=datetime.now(timezone.utc)
-        )
-        mock_repo.create.return_value = created_user
 
         result = add_user(
-            session=mock_db,
+            session=mock_session,
             username="newuser",
             email="new@example.com",
             first_name="New",
@@ -127,16 +98,12 @@ class TestAddUser:
         mock_hash.assert_called_once_with("SecurePass123!")
         mock_repo.create.assert_called_once()
 
-    @patch('src.services.user.UserRepository')
-    @patch('src.services.user.get_password_hash')
-    def test_add_user_duplicate_returns_none(self, mock_hash, mock_repo):
+    def test_add_user_duplicate_returns_none(self, mock_session, mock_repo, mock_hash):
         """Should return None when username/email already exists."""
-        mock_db = Mock()
-        mock_hash.return_value = "hashed_password"
-        mock_repo.create.side_effect = IntegrityError(None, None, None)
+        mock_repo.create.side_effect = _INTEGRITY_ERROR
 
         result = add_user(
-            session=mock_db,
+            session=mock_session,
             username="existinguser",
             email="existing@example.com",
             first_name="Existing",
@@ -145,31 +112,14 @@ class TestAddUser:
         )
 
         assert result is None
-        mock_db.rollback.assert_called_once()
+        mock_session.rollback.assert_called_once()
 
-    @patch('src.services.user.UserRepository')
-    @patch('src.services.user.get_password_hash')
-    def test_add_user_custom_created_at(self, mock_hash, mock_repo):
+    def test_add_user_custom_created_at(self, mock_session, mock_repo, mock_hash):
         """Should use custom created_at when provided."""
-        mock_db = Mock()
-        mock_hash.return_value = "hashed_password"
         custom_time = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
 
-        created_user = UserDB(
-            id=1,
-            uuid="new-uuid",
-            username="newuser",
-            email="new@example.com",
-            first_name="New",
-            last_name="User",
-            hashed_password="hashed_password",
-            disabled=False,
-            created_at=custom_time
-        )
-        mock_repo.create.return_value = created_user
-
         result = add_user(
-            session=mock_db,
+            session=mock_session,
             username="newuser",
             email="new@example.com",
             first_name="New",
@@ -184,28 +134,11 @@ class TestAddUser:
         created_db_user = call_args[0][1]
         assert created_db_user.created_at == custom_time
 
-    @patch('src.services.user.UserRepository')
-    @patch('src.services.user.get_password_hash')
-    def test_add_user_sets_disabled_false(self, mock_hash, mock_repo):
+    def test_add_user_sets_disabled_false(self, mock_session, mock_repo, mock_hash):
         """New users should be created with disabled=False."""
-        mock_db = Mock()
-        mock_hash.return_value = "hashed_password"
-
-        created_user = UserDB(
-            id=1,
-            uuid="new-uuid",
-            username="newuser",
-            email="new@example.com",
-            first_name="New",
-            last_name="User",
-            hashed_password="hashed_password",
-            disabled=False,
-            created_at=datetime.now(timezone.utc)
-        )
-        mock_repo.create.return_value = created_user
 
         add_user(
-            session=mock_db,
+            session=mock_session,
             username="newuser",
             email="new@example.com",
             first_name="New",
@@ -222,45 +155,27 @@ class TestAddUser:
 class TestDeactivateUser:
     """Tests for deactivate_user function."""
 
-    @patch('src.services.user.UserRepository')
-    def test_deactivate_user_success(self, mock_repo):
-        """Should set disabled=True and update user."""
-        mock_db = Mock()
-        user = UserDB(
-            id=1,
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            hashed_password="hashed_password",
-            disabled=False,
-            created_at=datetime.now(timezone.utc)
-        )
-        mock_repo.update.return_value = user
+    def test_deactivate_user_success(self, mock_session, mock_repo, sample_user):
+        """Should disable the user by ID without loading it again."""
+        mock_repo.deactivate.return_value = True
 
-        deactivate_user(mock_db, user)
+        result = deactivate_user(mock_session, sample_user)
 
-        assert user.disabled is True
-        mock_repo.update.assert_called_once_with(mock_db, user)
+        assert result is True
+        mock_repo.deactivate.assert_called_once_with(mock_session, 1)
+        mock_repo.get_by_uuid.assert_not_called()
 
-    @patch('src.services.user.UserRepository')
-    def test_deactivate_user_already_disabled(self, mock_repo):
-        """Should skip DB write if user already disabled."""
-        mock_db = Mock()
-        user = UserDB(
-            id=1,
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            hashed_password="hashed_password",
-            disabled=True,  # Already disabled
-            created_at=datetime.now(timezone.utc)
-        )
+    def test_deactivate_user_not_found(self, mock_session, mock_repo, sample_user):
+        """Should return False when the user no longer exists."""
+        mock_repo.deactivate.return_value = False
+
+        result = deactivate_user(mock_session, sample_user)
 
-        result = deactivate_user(mock_db, user)
+        assert result is False
+
+    def test_deactivate_user_already_disabled(self, mock_session, mock_repo, sample_user):
+        """Should skip DB write if user already disabled."""
+        result = deactivate_user(mock_session, sample_user.model_copy(update={"disabled": True}))  # Already disabled
 
-        assert result == user
-        mock_repo.update.assert_not_called()
+        assert result is True
+        mock_repo.deactivate.assert_not_called()
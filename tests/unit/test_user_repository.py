@@ -1,107 +1,37 @@
 """Unit tests for user repository (src/repositories/user_repository.py)."""
-from unittest.mock import Mock
+import pytest
+from types import SimpleNamespace
 from datetime import datetime, timezone
 
 from src.repositories.user_repository import UserRepository
 from src.database.models import UserDB
 
 
-class TestUserRepositoryGetByUsername:
-    """Tests for UserRepository.get_by_username."""
+class TestUserRepositoryGetByField:
+    """Tests for UserRepository.get_by_username, get_by_email and get_by_uuid."""
 
-    def test_get_by_username_found(self):
-        """Should return user when found."""
-        mock_db = Mock()
-        mock_user = UserDB(
-            id=1,
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            hashed_password="hashed",
-            disabled=False,
-            created_at=datetime.now(timezone.utc)
-        )
-        mock_db.exec.return_value.first.return_value = mock_user
-
-        result = UserRepository.get_by_username(mock_db, "testuser")
-
-        assert result == mock_user
-        mock_db.exec.assert_called_once()
-
-    def test_get_by_username_not_found(self):
-        """Should return None when user not found."""
-        mock_db = Mock()
-        mock_db.exec.return_value.first.return_value = None
-
-        result = UserRepository.get_by_username(mock_db, "nonexistent")
-
-        assert result is None
-
-
-class TestUserRepositoryGetByEmail:
-    """Tests for UserRepository.get_by_email."""
-
-    def test_get_by_email_found(self):
-        """Should return user when found."""
-        mock_db = Mock()
-        mock_user = UserDB(
-            id=1,
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            hashed_password="hashed",
-            disabled=False,
-            created_at=datetime.now(timezone.utc)
-        )
-        mock_db.exec.return_value.first.return_value = mock_user
-
-        result = UserRepository.get_by_email(mock_db, "test@example.com")
-
-        assert result == mock_user
-
-    def test_get_by_email_not_found(self):
-        """Should return None when email not found."""
-        mock_db = Mock()
-        mock_db.exec.return_value.first.return_value = None
-
-        result = UserRepository.get_by_email(mock_db, "notfound@example.com")
-
-        assert result is None
+    LOOKUPS = [
+        ("get_by_username", "testuser"),
+        ("get_by_email", "test@example.com"),
+        ("get_by_uuid", "test-uuid"),
+    ]
 
-
-class TestUserRepositoryGetByUuid:
-    """Tests for UserRepository.get_by_uuid."""
-
-    def test_get_by_uuid_found(self):
+    @pytest.mark.parametrize("method,value", LOOKUPS)
+    def test_get_found(self, mock_session, sample_user_db, method, value):
         """Should return user when found."""
-        mock_db = Mock()
-        mock_user = UserDB(
-            id=1,
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            hashed_password="hashed",
-            disabled=False,
-            created_at=datetime.now(timezone.utc)
-        )
-        mock_db.exec.return_value.first.return_value = mock_user
+        mock_session.exec.return_value = SimpleNamespace(first=lambda: sample_user_db)
 
-        result = UserRepository.get_by_uuid(mock_db, "test-uuid")
+        result = getattr(UserRepository, method)(mock_session, value)
 
-        assert result == mock_user
+        assert result == sample_user_db
+        mock_session.exec.assert_called_once()
 
-    def test_get_by_uuid_not_found(self):
-        """Should return None when uuid not found."""
-        mock_db = Mock()
-        mock_db.exec.return_value.first.return_value = None
+    @pytest.mark.parametrize("method,value", LOOKUPS)
+    def test_get_not_found(self, mock_session, method, value):
+        """Should return None when user not found."""
+        mock_session.exec.return_value = SimpleNamespace(first=lambda: None)
 
-        result = UserRepository.get_by_uuid(mock_db, "nonexistent-uuid")
+        result = getattr(UserRepository, method)(mock_session, value)
 
         assert result is None
 
@@ -109,32 +39,20 @@ class TestUserRepositoryGetByUuid:
 class TestUserRepositoryGetById:
     """Tests for UserRepository.get_by_id."""
 
-    def test_get_by_id_found(self):
+    def test_get_by_id_found(self, mock_session, sample_user_db):
         """Should return user when found."""
-        mock_db = Mock()
-        mock_user = UserDB(
-            id=1,
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            hashed_password="hashed",
-            disabled=False,
-            created_at=datetime.now(timezone.utc)
-        )
-        mock_db.exec.return_value.first.return_value = mock_user
+        mock_session.get.return_value = sample_user_db
 
-        result = UserRepository.get_by_id(mock_db, 1)
+        result = UserRepository.get_by_id(mock_session, 1)
 
-        assert result == mock_user
+        assert result == sample_user_db
+        mock_session.get.assert_called_once_with(UserDB, 1)
 
-    def test_get_by_id_not_found(self):
+    def test_get_by_id_not_found(self, mock_session):
         """Should return None when id not found."""
-        mock_db = Mock()
-        mock_db.exec.return_value.first.return_value = None
+        mock_session.get.return_value = None
 
-        result = UserRepository.get_by_id(mock_db, 999)
+        result = UserRepository.get_by_id(mock_session, 999)
 
         assert result is None
 
@@ -142,9 +60,8 @@ class TestUserRepositoryGetById:
 class TestUserRepositoryCreate:
     """Tests for UserRepository.create."""
 
-    def test_create_user(self):
+    def test_create_user(self, mock_session, sample_now):
         """Should add user to database and return it."""
-        mock_db = Mock()
         user = UserDB(
             username="newuser",
             email="new@example.com",
@@ -152,63 +69,87 @@ class TestUserRepositoryCreate:
             last_name="User",
             hashed_password="hashed",
             disabled=False,
-            created_at=datetime.now(timezone.utc)
+            created_at=sample_now
         )
 
-        result = UserRepository.create(mock_db, user)
+        result = UserRepository.create(mock_session, user)
 
-        mock_db.add.assert_called_once_with(user)
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once_with(user)
+        mock_session.add.assert_called_once_with(user)
+        mock_session.commit.assert_called_once()
+        mock_session.refresh.assert_called_once_with(user)
+        assert result == user
+
+    def test_create_user_without_commit(self, mock_session, sample_now):
+        """Should only flush when commit is deferred to the caller."""
+        user = UserDB(
+            username="newuser",
+            email="new@example.com",
+            hashed_password="hashed",
+            disabled=False,
+            created_at=sample_now
+        )
+
+        result = UserRepository.create(mock_session, user, commit=False)
+
+        mock_session.add.assert_called_once_with(user)
+        mock_session.flush.assert_called_once()
+        mock_session.commit.assert_not_called()
         assert result == user
 
 
 class TestUserRepositoryUpdate:
     """Tests for UserRepository.update."""
 
-    def test_update_user(self):
+    def test_update_user(self, mock_session, sample_user_db, monkeypatch):
         """Should update user and set updated_at."""
-        mock_db = Mock()
-        user = UserDB(
-            id=1,
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            hashed_password="hashed",
-            disabled=False,
-            created_at=datetime.now(timezone.utc)
-        )
+        now = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+        class _FrozenDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return now
+
+        monkeypatch.setattr('src.repositories.user_repository.datetime', _FrozenDatetime)
+        # A copy of its own: update modifies the row
+        user = UserDB(**sample_user_db.model_dump())
 
-        result = UserRepository.update(mock_db, user)
+        result = UserRepository.update(mock_session, user)
 
-        assert user.updated_at is not None
-        mock_db.add.assert_called_once_with(user)
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once_with(user)
+        assert user.updated_at == now
+        mock_session.add.assert_called_once_with(user)
+        mock_session.commit.assert_called_once()
+        mock_session.refresh.assert_called_once_with(user)
         assert result == user
 
 
+class TestUserRepositoryDeactivate:
+    """Tests for UserRepository.deactivate."""
+
+    def test_deactivate_user(self, mock_session):
+        """Should disable the user with a single UPDATE and commit."""
+        mock_session.exec.return_value = SimpleNamespace(rowcount=1)
+
+        result = UserRepository.deactivate(mock_session, 1)
+
+        assert result is True
+        mock_session.exec.assert_called_once()
+        mock_session.commit.assert_called_once()
+
+    def test_deactivate_user_not_found(self, mock_session):
+        """Should return False when no user has the given ID."""
+        mock_session.exec.return_value = SimpleNamespace(rowcount=0)
+
+        result = UserRepository.deactivate(mock_session, 999)
+
+        assert result is False
+
+
 class TestUserRepositoryDelete:
     """Tests for UserRepository.delete."""
 
-    def test_delete_user(self):
+    def test_delete_user(self, mock_session, sample_user_db):
         """Should delete user from database."""
-        mock_db = Mock()
-        user = UserDB(
-            id=1,
-            uuid="test-uuid",
-            username="testuser",
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            hashed_password="hashed",
-            disabled=False,
-            created_at=datetime.now(timezone.utc)
-        )
-
-        UserRepository.delete(mock_db, user)
+        UserRepository.delete(mock_session, sample_user_db)
 
-        mock_db.delete.assert_called_once_with(user)
-        mock_db.commit.assert_called_once()
+        mock_session.delete.assert_called_once_with(sample_user_db)
+        mock_session.commit.assert_called_once()
@@ -17,12 +17,11 @@ class TestNormalizeUsername:
         assert normalize_username("  testuser  ") == "testuser"
         assert normalize_username("\ttestuser\n") == "testuser"
 
-    def test_normalize_empty_raises(self):
+    @pytest.mark.parametrize("value", ["", "   "])
+    def test_normalize_empty_raises(self, value):
         """Empty username should raise ValueError."""
         with pytest.raises(ValueError, match="cannot be empty"):
-            normalize_username("")
-        with pytest.raises(ValueError, match="cannot be empty"):
-            normalize_username("   ")
+            normalize_username(value)
 
     def test_normalize_too_short_raises(self):
         """Username shorter than 3 chars should raise ValueError."""
@@ -51,32 +50,23 @@ class TestValidateUsername:
         assert validate_username("test-user") == "test-user"
         assert validate_username("user123") == "user123"
 
-    def test_validate_invalid_characters(self):
+    @pytest.mark.parametrize("value", ["test@user", "test user", "test#user"])
+    def test_validate_invalid_characters(self, value):
         """Usernames with invalid characters should raise ValueError."""
         with pytest.raises(ValueError, match="can only contain"):
-            validate_username("test@user")
-        with pytest.raises(ValueError, match="can only contain"):
-            validate_username("test user")
-        with pytest.raises(ValueError, match="can only contain"):
-            validate_username("test#user")
+            validate_username(value)
 
-    def test_validate_reserved_usernames(self):
+    @pytest.mark.parametrize("value", ["admin", "root", "superuser", "system"])
+    def test_validate_reserved_usernames(self, value):
         """Reserved usernames should raise ValueError."""
         with pytest.raises(ValueError, match="reserved"):
-            validate_username("admin")
-        with pytest.raises(ValueError, match="reserved"):
-            validate_username("root")
-        with pytest.raises(ValueError, match="reserved"):
-            validate_username("superuser")
-        with pytest.raises(ValueError, match="reserved"):
-            validate_username("system")
+            validate_username(value)
 
-    def test_validate_reserved_case_insensitive(self):
+    @pytest.mark.parametrize("value", ["ADMIN", "Root"])
+    def test_validate_reserved_case_insensitive(self, value):
         """Reserved usernames should be caught regardless of case."""
         with pytest.raises(ValueError, match="reserved"):
-            validate_username("ADMIN")
-        with pytest.raises(ValueError, match="reserved"):
-            validate_username("Root")
+            validate_username(value)
 
 
 class TestValidatePassword:
@@ -88,35 +78,18 @@ class TestValidatePassword:
         assert validate_password("MyP@ssw0rd") == "MyP@ssw0rd"
         assert validate_password("Complex-Password123") == "Complex-Password123"
 
-    def test_validate_too_short(self):
-        """Password shorter than 8 chars should raise ValueError."""
-        with pytest.raises(ValueError, match="at least 8"):
-            validate_password("Short1!")
-
-    def test_validate_too_long(self):
-        """Password longer than 128 chars should raise ValueError."""
-        with pytest.raises(ValueError, match="at most 128"):
-            validate_password("A1!" + "a" * 126)
-
-    def test_validate_missing_uppercase(self):
-        """Password without uppercase should raise ValueError."""
-        with pytest.raises(ValueError, match="uppercase"):
-            validate_password("lowercase1!")
-
-    def test_validate_missing_lowercase(self):
-        """Password without lowercase should raise ValueError."""
-        with pytest.raises(ValueError, match="lowercase"):
-            validate_password("UPPERCASE1!")
-
-    def test_validate_missing_digit(self):
-        """Password without digit should raise ValueError."""
-        with pytest.raises(ValueError, match="digit"):
-            validate_password("NoDigits!")
-
-    def test_validate_missing_special(self):
-        """Password without special character should raise ValueError."""
-        with pytest.raises(ValueError, match="special"):
-            validate_password("NoSpecial1")
+    @pytest.mark.parametrize("password,message", [
+        ("Short1!", "at least 8"),
+        ("A1!" + "a" * 126, "at most 128"),
+        ("lowercase1!", "uppercase"),
+        ("UPPERCASE1!", "lowercase"),
+        ("NoDigits!", "digit"),
+        ("NoSpecial1", "special"),
+    ], ids=["too_short", "too_long", "missing_uppercase", "missing_lowercase", "missing_digit", "missing_special"])
+    def test_validate_rule_violations(self, password, message):
+        """Passwords breaking a length or character class rule should raise ValueError naming the rule."""
+        with pytest.raises(ValueError, match=message):
+            validate_password(password)
 
     def test_validate_boundary_lengths(self):
         """Passwords at boundary lengths should work correctly."""